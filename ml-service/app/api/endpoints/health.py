@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends
-from app.db.mongodb import get_database, is_database_connected
-from app.utils.redis_util import ping_redis
+from fastapi import APIRouter
+from app.db.mongodb import mongo_breaker
+from app.utils.redis_util import redis_breaker
+from app.core.serving import process_stats
+from app.utils.admission import search_admission, processing_admission
 
 router = APIRouter()
 
@@ -9,13 +11,18 @@ router = APIRouter()
     description="Check the health of the AI service",
     summary="Health check"
 )
-async def health_check(db=Depends(get_database)):
-    """Check if the AI service is healthy"""
-    db_status = await is_database_connected(db)
-    redis_status = await ping_redis()
+async def health_check():
+    """Check if the AI service is healthy using cached circuit breaker state"""
+    db_status = mongo_breaker.is_available
+    redis_status = redis_breaker.is_available
     
-    # Service is healthy if all components are connected
-    overall_status = "healthy" if (db_status and redis_status) else "unhealthy"
+    # Redis outages only degrade caching; the database is required
+    if db_status and redis_status:
+        overall_status = "healthy"
+    elif db_status:
+        overall_status = "degraded"
+    else:
+        overall_status = "unhealthy"
     
     return {
         "status": overall_status,
@@ -23,5 +30,14 @@ async def health_check(db=Depends(get_database)):
             "database": "connected" if db_status else "disconnected",
             "redis": "connected" if redis_status else "disconnected",
         },
+        "breakers": {
+            "database": mongo_breaker.snapshot(),
+            "redis": redis_breaker.snapshot(),
+        },
+        "admission": {
+            "taxonomy_search": search_admission.snapshot(),
+            "data_process": processing_admission.snapshot(),
+        },
+        "worker": process_stats(),
         "version": "1.0.0"
-    }
\ No newline at end of file
+    }
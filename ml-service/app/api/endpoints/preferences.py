@@ -1,10 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends, Body, BackgroundTasks
 from app.models.preferences import UserDataEntry, UserPreferences, UserPreference
-from app.db.mongodb import get_database
-from app.services.preferenceProcessor import process_user_data, update_user_preferences
+from app.db.mongodb import get_database, database_guard
+from app.services.preferenceProcessor import (
+    process_user_data, update_user_preferences, get_processed_result, processed_payload_key
+)
 from app.utils.preference_utils import mark_processing_failed
 from app.utils.redis_util import invalidate_cache, CACHE_KEYS
-from typing import List
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.admission import AdmissionRejected, processing_admission, CHEAP, MODEL_BOUND
+from app.api.errors import service_unavailable, overloaded
+from typing import List, Optional
 from datetime import datetime
 import logging
 
@@ -32,25 +37,37 @@ async def process_user_data_endpoint(
     data_type = data.data_type
     entries = data.entries
     
-    logger.info(f"POST request received for data processing:")
-    logger.info(f"  User: {user_id}")
-    logger.info(f"  Data type: {data_type}")
-    logger.info(f"  Number of entries: {len(data.entries)}")
+    logger.info(f"Data processing request: user={user_id} type={data_type} entries={len(entries)}")
     
     try:
-        result = await process_user_data(data, db)
+        async with database_guard():
+            # Duplicates are answered without queueing; purchase data needs no model
+            processed_key = processed_payload_key(data)
+            result = await get_processed_result(data, db, processed_key)
+            if result is None:
+                result = await process_user_data(
+                    data, db, checked_key=processed_key, admission=processing_admission,
+                    priority=CHEAP if data_type == "purchase" else MODEL_BOUND
+                )
         
         return {
             "status": "success",
             "message": "Data processed successfully",
-            "user_id": result.user_id,
+            "user_id": result["user_id"],
             "preferences_updated": True,
-            "preferences_count": len(result.preferences),
+            "preferences_count": len(result["preferences"]),
             "attributes_processed": {}
         }
+    except CircuitOpenError as e:
+        # Database is down; nothing to mark, let the caller retry later
+        raise service_unavailable(e)
+    except AdmissionRejected as e:
+        # Shed under load; the entry stays pending for the caller's retry
+        raise overloaded(e)
     except HTTPException as e:
-        # For user errors, mark processing as failed
-        background_tasks.add_task(mark_processing_failed, db, email)
+        # For user errors, mark processing as failed; a 409 means the original copy is still running
+        if e.status_code != 409:
+            background_tasks.add_task(mark_processing_failed, db, email)
         raise e
     except Exception as e:
         # For system errors, also mark processing as failed
@@ -73,6 +90,7 @@ async def update_preferences_endpoint(
     preferences: List[UserPreference] = Body(...),
     auth0_id: str = Body(...),
     email: str = Body(...),
+    store_id: Optional[str] = Body(None),
     db=Depends(get_database)
 ):
     """Update user preferences directly from the API service"""
@@ -81,8 +99,11 @@ async def update_preferences_endpoint(
     
     try:
         # Call the processor function instead of handling processing here
-        result = await update_user_preferences(auth0_id, email, preferences, db)
+        async with database_guard():
+            result = await update_user_preferences(auth0_id, email, preferences, db, store_id)
         return result
+    except CircuitOpenError as e:
+        raise service_unavailable(e)
     except HTTPException:
         raise
     except Exception as e:
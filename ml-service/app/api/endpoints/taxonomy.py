@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Body
+from app.models.taxonomy import TaxonomyExtension
 from app.services.taxonomyService import get_taxonomy_service
-from typing import Dict, Any
+from app.db.mongodb import database_guard
+from app.utils.admission import AdmissionRejected, search_admission
+from app.utils.circuit_breaker import CircuitOpenError
+from app.api.errors import overloaded, service_unavailable
+from typing import Dict, Any, Optional
 
 router = APIRouter()
 
@@ -10,15 +15,58 @@ router = APIRouter()
 )
 async def search_taxonomy(
     query: str,
+    store_id: Optional[str] = None,
     taxonomy=Depends(get_taxonomy_service),
 ):
-    """Search taxonomy categories by query text"""
+    """Search taxonomy categories by query text, optionally including a store's extension"""
     try:
-        result = await taxonomy.match_category(query)
-        return result
+        # Cache hits skip admission; misses and store index builds queue for a slot
+        result = await taxonomy.cached_match(query, store_id)
+        if result:
+            return result
+        async with search_admission.admit():
+            return await taxonomy.compute_match(query, store_id)
+    except AdmissionRejected as e:
+        raise overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@router.put(
+    "/stores/{store_id}/extension",
+    summary="Register a store taxonomy extension"
+)
+async def register_store_extension(
+    store_id: str,
+    extension: TaxonomyExtension = Body(...),
+    taxonomy=Depends(get_taxonomy_service),
+):
+    """Register or replace a store's categories and attribute values layered on the global taxonomy"""
+    try:
+        async with database_guard():
+            return await taxonomy.register_store_extension(store_id, extension)
+    except CircuitOpenError as e:
+        raise service_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Extension registration failed: {str(e)}")
+
+@router.post(
+    "/reload",
+    summary="Hot reload the taxonomy"
+)
+async def reload_taxonomy(
+    taxonomy=Depends(get_taxonomy_service),
+):
+    """Reload the current taxonomy, re-embedding only changed categories"""
+    try:
+        async with database_guard():
+            return await taxonomy.reload()
+    except CircuitOpenError as e:
+        raise service_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+
 @router.get(
     "/health",
     summary="Check taxonomy service health"
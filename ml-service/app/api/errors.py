@@ -0,0 +1,19 @@
+from fastapi import HTTPException
+from app.utils.admission import AdmissionRejected
+from app.utils.circuit_breaker import CircuitOpenError
+
+def service_unavailable(error: CircuitOpenError) -> HTTPException:
+    """Fast 503 response while a dependency's circuit breaker is open"""
+    return HTTPException(
+        status_code=503,
+        detail=f"Service temporarily unavailable: {error.name} is down",
+        headers={"Retry-After": str(max(1, int(error.retry_after)))}
+    )
+
+def overloaded(error: AdmissionRejected) -> HTTPException:
+    """Fast 429/503 response when admission control sheds a request"""
+    return HTTPException(
+        status_code=error.status_code,
+        detail=f"Service overloaded, retry later: {error.name} ({error.reason})",
+        headers={"Retry-After": str(max(1, int(error.retry_after)))}
+    )
@@ -17,11 +17,19 @@ class Settings(BaseSettings):
     # MongoDB Settings
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
     MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "tapiro")
+    MONGODB_TIMEOUT_MS: int = int(os.getenv("MONGODB_TIMEOUT_MS", "3000"))
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+    SLOW_QUERY_RETENTION_DAYS: int = int(os.getenv("SLOW_QUERY_RETENTION_DAYS", "7"))
     
     # Security
     API_KEY_NAME: str = "X-API-Key"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-development-only")
     
+    # On-demand profiling: send PROFILE_HEADER with the API key, or sample a share of requests
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "/tmp/profiles")
+    
     # Node.js Backend API
     BACKEND_API_URL: str = os.getenv("BACKEND_API_URL", "http://backend:3000")
     
@@ -34,9 +42,63 @@ class Settings(BaseSettings):
         "http://web:5173"
     ]
     
+    # Preference decay: scores halve every half-life (0 disables decay)
+    PREFERENCE_DECAY_HALF_LIFE_DAYS: float = float(os.getenv("PREFERENCE_DECAY_HALF_LIFE_DAYS", "90"))
+    
+    # Preference document bounds
+    MAX_PREFERENCE_CATEGORIES: int = int(os.getenv("MAX_PREFERENCE_CATEGORIES", "50"))
+    MAX_ATTRIBUTE_VALUES: int = int(os.getenv("MAX_ATTRIBUTE_VALUES", "10"))
+    MIN_PREFERENCE_SCORE: float = float(os.getenv("MIN_PREFERENCE_SCORE", "0.01"))
+    
+    # Embedding model and persistent embedding store
+    EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+    MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", "/app/model_cache")
+    EMBEDDING_STORE_PATH: str = os.getenv("EMBEDDING_STORE_PATH", "/app/model_cache/embeddings.sqlite3")
+    # Embedding store bounds: rows kept (LRU), seconds between buffered writes and between prunes
+    EMBEDDING_STORE_MAX_ROWS: int = int(os.getenv("EMBEDDING_STORE_MAX_ROWS", "200000"))
+    EMBEDDING_STORE_FLUSH_INTERVAL: float = float(os.getenv("EMBEDDING_STORE_FLUSH_INTERVAL", "2"))
+    EMBEDDING_STORE_PRUNE_INTERVAL: float = float(os.getenv("EMBEDDING_STORE_PRUNE_INTERVAL", "3600"))
+    
+    # Category index: "auto" switches from exact search to IVF at ANN_MIN_CATEGORIES
+    CATEGORY_INDEX_TYPE: str = os.getenv("CATEGORY_INDEX_TYPE", "auto")
+    ANN_MIN_CATEGORIES: int = int(os.getenv("ANN_MIN_CATEGORIES", "5000"))
+    IVF_NPROBE: int = int(os.getenv("IVF_NPROBE", "8"))
+    
+    # Minimum cosine score for inferring an attribute value from free text
+    ATTRIBUTE_MATCH_THRESHOLD: float = float(os.getenv("ATTRIBUTE_MATCH_THRESHOLD", "0.35"))
+    
+    # Per-store taxonomy extensions: LRU size and seconds before an index is refreshed
+    STORE_INDEX_CACHE_SIZE: int = int(os.getenv("STORE_INDEX_CACHE_SIZE", "256"))
+    STORE_INDEX_TTL: float = float(os.getenv("STORE_INDEX_TTL", "300"))
+    # Seconds a "no extension" or failed lookup is cached, so other workers pick up new extensions quickly
+    STORE_INDEX_NEGATIVE_TTL: float = float(os.getenv("STORE_INDEX_NEGATIVE_TTL", "5"))
+    
+    # Taxonomy hot reload: seconds between checks of the DB document (0 disables)
+    TAXONOMY_WATCH_INTERVAL: float = float(os.getenv("TAXONOMY_WATCH_INTERVAL", "30"))
+    
+    # Multi-worker serving: preloaded category matrices are memory-mapped from here
+    SHARED_MEMORY_DIR: str = os.getenv("SHARED_MEMORY_DIR", "/dev/shm/tapiro")
+    TORCH_THREADS_PER_WORKER: int = int(os.getenv("TORCH_THREADS_PER_WORKER", "1"))
+    
     # Redis settings
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    
+    # Duplicate uploads: seconds a payload stays claimed while processing, and a retry waits for it
+    PROCESSING_CLAIM_TTL: int = int(os.getenv("PROCESSING_CLAIM_TTL", "60"))
+    PROCESSING_CLAIM_WAIT: float = float(os.getenv("PROCESSING_CLAIM_WAIT", "5"))
+    
+    # Circuit breaker settings (Redis and MongoDB)
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+    BREAKER_RESET_TIMEOUT: float = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+    HEALTH_PROBE_INTERVAL: float = float(os.getenv("HEALTH_PROBE_INTERVAL", "10"))
+    
+    # Admission control (per worker): concurrent requests, queued requests, seconds a request may wait
+    SEARCH_MAX_CONCURRENCY: int = int(os.getenv("SEARCH_MAX_CONCURRENCY", "8"))
+    SEARCH_MAX_QUEUE: int = int(os.getenv("SEARCH_MAX_QUEUE", "32"))
+    PROCESS_MAX_CONCURRENCY: int = int(os.getenv("PROCESS_MAX_CONCURRENCY", "4"))
+    PROCESS_MAX_QUEUE: int = int(os.getenv("PROCESS_MAX_QUEUE", "16"))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2"))
 
 # Create global settings object
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from pymongo import monitoring
+
+# Latency buckets (seconds) tuned for sub-millisecond cache calls up to slow model batches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+ENCODE_LATENCY = Histogram(
+    "embedding_encode_duration_seconds", "Time spent in the embedding model per encode call",
+    buckets=LATENCY_BUCKETS
+)
+ENCODE_BATCH_SIZE = Histogram(
+    "embedding_encode_batch_size", "Texts per embedding model encode call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+)
+REDIS_LATENCY = Histogram(
+    "redis_operation_duration_seconds", "Redis operation latency",
+    ["operation"], buckets=LATENCY_BUCKETS
+)
+REDIS_CACHE_REQUESTS = Counter(
+    "redis_cache_requests_total", "Redis cache reads by result (hit, miss, error, skipped)",
+    ["result"]
+)
+MONGO_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency",
+    ["command", "status"], buckets=LATENCY_BUCKETS
+)
+TAXONOMY_INIT_DURATION = Histogram(
+    "taxonomy_init_duration_seconds", "Taxonomy load and embedding initialization time",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+# L1 is the Redis search-result cache, L2 the persistent embedding store
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "embedding_cache_lookups_total", "Search-result (L1) and embedding store (L2) lookups",
+    ["layer", "result"]
+)
+PROCESSING_LATENCY = Histogram(
+    "preference_processing_duration_seconds", "User data processing time by data type",
+    ["data_type"], buckets=LATENCY_BUCKETS
+)
+# Admission control; gauges are summed across live workers in multiprocess mode
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests", "Requests holding an admission slot",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Requests waiting for an admission slot",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_duration_seconds", "Time spent waiting for an admission slot",
+    ["endpoint"], buckets=LATENCY_BUCKETS
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Requests rejected by admission control (queue_full, shed, timeout)",
+    ["endpoint", "reason"]
+)
+
+@contextmanager
+def timed(histogram, **labels):
+    """Observe the duration of a block on a histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target = histogram.labels(**labels) if labels else histogram
+        target.observe(time.perf_counter() - start)
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """Record MongoDB command latency from the driver's own timings"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.labels(command=event.command_name, status="ok").observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_LATENCY.labels(command=event.command_name, status="error").observe(event.duration_micros / 1e6)
+
+def render_metrics():
+    """Metrics payload and content type; aggregates all workers in multiprocess mode"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
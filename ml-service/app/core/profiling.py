@@ -0,0 +1,117 @@
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# cProfile hooks the whole thread, so only one request per process is profiled at a time
+_profile_active = False
+
+# Profiles of worker-thread work done for the profiled request; asyncio.to_thread copies the context
+_thread_profiles: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar("thread_profiles", default=None)
+
+def profile_in_thread(func):
+    """
+    Profile a function run through asyncio.to_thread on behalf of a profiled
+    request; the stats are merged into that request's profile. A no-op otherwise.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        collected = _thread_profiles.get()
+        if collected is None:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            collected.append(profiler)
+    return wrapper
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling.
+
+    A request is profiled when it carries the profile header together with a
+    valid API key, or when it is picked by PROFILE_SAMPLE_RATE. The cProfile
+    output (.prof for snakeviz/pstats, plus a .txt summary by cumulative time)
+    is saved to PROFILE_DIR and its id returned in the X-Profile-Id header.
+
+    cProfile observes the whole event loop thread while the request runs, so
+    concurrent requests can appear in the profile. Model-bound work pushed to
+    threads (query scoring, store index builds) is profiled in its thread via
+    profile_in_thread and merged in; other threaded work (reload encodes) is
+    not. Only one profile runs per process; requests arriving meanwhile, and
+    requests matching neither trigger, pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILE_HEADER.lower().encode("latin-1")
+        self.api_key_header = settings.API_KEY_NAME.lower().encode("latin-1")
+
+    def _should_profile(self, scope) -> bool:
+        headers = dict(scope.get("headers") or [])
+        flag = headers.get(self.header)
+        if flag and flag.lower() not in (b"0", b"false"):
+            # Only callers holding the service API key may request a profile
+            return headers.get(self.api_key_header, b"").decode("latin-1") == settings.SECRET_KEY
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        global _profile_active
+        if scope["type"] != "http" or _profile_active or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{re.sub(r'[^a-zA-Z0-9]+', '_', scope['path']).strip('_')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                message["headers"] = headers + [(b"x-profile-id", profile_id.encode("latin-1"))]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        thread_profiles = []
+        token = _thread_profiles.set(thread_profiles)
+        _profile_active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            profiler.disable()
+            _profile_active = False
+            _thread_profiles.reset(token)
+            self._save(profiler, thread_profiles, profile_id, scope, time.perf_counter() - start)
+
+    def _save(self, profiler, thread_profiles: List[cProfile.Profile], profile_id: str, scope, elapsed: float):
+        """Write the raw profile, merged with its thread profiles, and a readable summary to PROFILE_DIR"""
+        try:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            base = os.path.join(settings.PROFILE_DIR, profile_id)
+            summary = io.StringIO()
+            stats = pstats.Stats(profiler, stream=summary)
+            for thread_profile in thread_profiles:
+                stats.add(thread_profile)
+            stats.dump_stats(f"{base}.prof")
+
+            summary.write(f"{scope['method']} {scope['path']} took {elapsed * 1000:.1f}ms\n\n")
+            stats.sort_stats("cumulative").print_stats(40)
+            with open(f"{base}.txt", "w") as f:
+                f.write(summary.getvalue())
+            logger.info(f"Saved profile {profile_id} ({elapsed * 1000:.1f}ms)")
+        except Exception as e:
+            logger.error(f"Failed to save profile {profile_id}: {str(e)}")
@@ -0,0 +1,50 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Start of this process's life; reset in forked workers by gunicorn's post_fork hook
+_process_started = time.monotonic()
+_cold_start_seconds = None
+
+def mark_process_start():
+    """Reset the cold start clock (called in each worker right after fork)"""
+    global _process_started, _cold_start_seconds
+    _process_started = time.monotonic()
+    _cold_start_seconds = None
+
+def mark_ready():
+    """Record how long this process took to become ready to serve"""
+    global _cold_start_seconds
+    _cold_start_seconds = time.monotonic() - _process_started
+    stats = process_stats()
+    logger.info(
+        f"Worker {stats['pid']} ready in {stats['cold_start_seconds']}s, "
+        f"rss={stats['rss_mb']}MB private={stats['private_mb']}MB"
+    )
+
+def _read_memory_kb():
+    """Resident and private (unshared) memory in kB from /proc"""
+    rss = private = None
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                field, value = line.split(":", 1)
+                if field == "Rss":
+                    rss = int(value.split()[0])
+                elif field in ("Private_Clean", "Private_Dirty"):
+                    private = (private or 0) + int(value.split()[0])
+    except (OSError, ValueError):
+        pass
+    return rss, private
+
+def process_stats() -> dict:
+    """Per-worker RSS, private memory and cold start time"""
+    rss, private = _read_memory_kb()
+    return {
+        "pid": os.getpid(),
+        "rss_mb": round(rss / 1024, 1) if rss is not None else None,
+        "private_mb": round(private / 1024, 1) if private is not None else None,
+        "cold_start_seconds": round(_cold_start_seconds, 3) if _cold_start_seconds is not None else None,
+    }
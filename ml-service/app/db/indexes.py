@@ -0,0 +1,57 @@
+import logging
+from pymongo import ASCENDING, IndexModel
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Indexes backing every ml-service query. The users definitions mirror the
+# api-service's so whichever service starts first creates the same index.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        IndexModel([("auth0Id", ASCENDING)], name="auth0Id_1", unique=True),
+    ],
+    "userData": [
+        # update_one({"email", "processedStatus": "pending"}) on every processed upload
+        IndexModel([("email", ASCENDING), ("processedStatus", ASCENDING)], name="email_1_processedStatus_1"),
+    ],
+    "taxonomy": [
+        IndexModel([("current", ASCENDING)], name="current_1"),
+    ],
+    "taxonomyExtensions": [
+        IndexModel([("storeId", ASCENDING)], name="storeId_1", unique=True),
+    ],
+    "slowQueries": [
+        IndexModel(
+            [("recordedAt", ASCENDING)],
+            name="recordedAt_ttl",
+            expireAfterSeconds=settings.SLOW_QUERY_RETENTION_DAYS * 86400
+        ),
+    ],
+}
+
+async def ensure_indexes(db) -> dict:
+    """
+    Create any missing indexes. Safe to run on every startup: existing indexes
+    with the same key pattern are left alone, whatever their name or options.
+    """
+    created = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+        except Exception as e:
+            logger.error(f"Cannot read indexes of {collection_name}: {str(e)}")
+            continue
+        existing_keys = {tuple(info["key"]) for info in existing.values()}
+
+        missing = [model for model in models if tuple(model.document["key"].items()) not in existing_keys]
+        if not missing:
+            continue
+        try:
+            created[collection_name] = await collection.create_indexes(missing)
+            logger.info(f"Created indexes on {collection_name}: {created[collection_name]}")
+        except Exception as e:
+            # e.g. duplicate values blocking a unique index; keep serving
+            logger.error(f"Failed to create indexes on {collection_name}: {str(e)}")
+    return created
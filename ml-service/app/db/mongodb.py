@@ -1,10 +1,26 @@
 import motor.motor_asyncio
+from contextlib import asynccontextmanager
+from pymongo.errors import ConnectionFailure
 from app.core.config import settings
+from app.core.metrics import MongoMetricsListener
+from app.db.slow_queries import SlowQueryListener, SlowQueryTracker
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 # MongoDB client instance
 client = None
 db = None
 
+# Explains and records commands slower than SLOW_QUERY_THRESHOLD_MS
+slow_query_listener = SlowQueryListener()
+slow_query_tracker = SlowQueryTracker(slow_query_listener)
+
+# Circuit breaker: while open, database-bound requests fail fast
+mongo_breaker = CircuitBreaker(
+    "mongodb",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT
+)
+
 async def get_database():
     """
     Get database connection
@@ -16,8 +32,14 @@ async def connect_to_mongodb():
     Connect to MongoDB
     """
     global client, db
-    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URI)
+    client = motor.motor_asyncio.AsyncIOMotorClient(
+        settings.MONGODB_URI,
+        serverSelectionTimeoutMS=settings.MONGODB_TIMEOUT_MS,
+        event_listeners=[MongoMetricsListener(), slow_query_listener]
+    )
     db = client[settings.MONGODB_DB_NAME]
+    mongo_breaker.start_monitor(lambda: is_database_connected(db), settings.HEALTH_PROBE_INTERVAL)
+    slow_query_tracker.start(db)
     return db
 
 async def close_mongodb_connection():
@@ -25,6 +47,8 @@ async def close_mongodb_connection():
     Close MongoDB connection
     """
     global client
+    await mongo_breaker.stop_monitor()
+    await slow_query_tracker.stop()
     if client:
         client.close()
 
@@ -35,4 +59,24 @@ async def is_database_connected(db) -> bool:
         await db.command("ping")
         return True
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+@asynccontextmanager
+async def database_guard():
+    """
+    Guard a block of database work with the MongoDB circuit breaker.
+    Raises CircuitOpenError without touching the database while the breaker is open.
+    """
+    if not mongo_breaker.allow_request():
+        raise CircuitOpenError(mongo_breaker.name, mongo_breaker.retry_after())
+    try:
+        yield
+    except ConnectionFailure:
+        mongo_breaker.record_failure()
+        raise
+    except Exception:
+        # The database answered; the error is not a connectivity problem
+        mongo_breaker.record_success()
+        raise
+    else:
+        mongo_breaker.record_success()
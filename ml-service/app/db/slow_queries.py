@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from pymongo import monitoring
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Commands that can be explained; everything else is ignored
+EXPLAINABLE_COMMANDS = {"find", "update", "delete", "aggregate", "count", "distinct", "findAndModify"}
+
+# Driver-added fields that explain does not accept
+SESSION_FIELDS = {"lsid", "$db", "$clusterTime", "txnNumber", "$readPreference", "autocommit", "startTransaction"}
+
+class SlowQueryListener(monitoring.CommandListener):
+    """
+    Queue commands that run longer than SLOW_QUERY_THRESHOLD_MS.
+
+    Driver callbacks must stay cheap, so this only remembers in-flight
+    commands and hands slow ones to SlowQueryTracker for explaining.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.slow = deque(maxlen=100)
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE_COMMANDS and event.command.get(event.command_name) != "slowQueries":
+            self.pending[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        entry = self.pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if entry and duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            database_name, command = entry
+            self.slow.append((event.command_name, database_name, command, duration_ms))
+
+    def failed(self, event):
+        self.pending.pop((event.connection_id, event.request_id), None)
+
+def summarize_plan(explain: dict) -> str:
+    """Compact description of the winning plan, e.g. 'FETCH > IXSCAN(email_1)'"""
+    planner = explain.get("queryPlanner", {})
+    stage = planner.get("winningPlan", {})
+    stage = stage.get("queryPlan", stage)  # Slot-based engine nests the plan
+    parts = []
+    while stage:
+        name = stage.get("stage", "?")
+        if stage.get("indexName"):
+            name += f"({stage['indexName']})"
+        parts.append(name)
+        stage = stage.get("inputStage")
+    return " > ".join(parts)
+
+class SlowQueryTracker:
+    """Explain queued slow commands and record them in the slowQueries collection"""
+
+    def __init__(self, listener: SlowQueryListener):
+        self.listener = listener
+        self._task = None
+
+    def start(self, db, interval: float = 5.0):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(db, interval))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            while self.listener.slow:
+                command_name, database_name, command, duration_ms = self.listener.slow.popleft()
+                try:
+                    await self._record(db, command_name, command, duration_ms)
+                except Exception as e:
+                    logger.error(f"Failed to explain slow {command_name}: {str(e)}")
+
+    async def _record(self, db, command_name: str, command, duration_ms: float):
+        clean = {key: value for key, value in command.items() if key not in SESSION_FIELDS}
+        explain = await db.command({"explain": clean, "verbosity": "queryPlanner"})
+        plan = summarize_plan(explain)
+        collection = command.get(command_name)
+
+        log = logger.warning if "COLLSCAN" in plan else logger.info
+        log(f"Slow {command_name} on {collection}: {duration_ms:.1f}ms, plan {plan}")
+        await db.slowQueries.insert_one({
+            "command": command_name,
+            "collection": collection,
+            "durationMs": duration_ms,
+            "plan": plan,
+            "filter": str(clean.get("filter") or clean.get("updates") or clean.get("deletes") or clean.get("pipeline")),
+            "recordedAt": datetime.now(),
+        })
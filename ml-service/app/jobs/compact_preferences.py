@@ -0,0 +1,88 @@
+"""
+Compaction job that shrinks existing user preference documents.
+
+Applies the same decay and pruning used during processing to every stored
+user and rewrites only the documents that actually get smaller.
+
+Usage: python -m app.jobs.compact_preferences [--batch-size 500] [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from pymongo import UpdateOne
+from app.db.mongodb import connect_to_mongodb, close_mongodb_connection
+from app.utils.preference_utils import apply_decay, prune_preferences
+from app.utils.redis_util import invalidate_cache, CACHE_KEYS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def compact_user_preferences(user: dict, now: datetime):
+    """Return the compacted preference list, or None if nothing would be removed"""
+    preferences = user.get("preferences") or []
+    decayed = [apply_decay(pref, now, user.get("updatedAt")) for pref in preferences]
+    compacted = prune_preferences(decayed)
+    
+    def size(prefs):
+        return len(prefs) + sum(
+            len(values) for pref in prefs for values in (pref.get("attributes") or {}).values()
+        )
+    
+    if size(compacted) < size(preferences):
+        return compacted
+    return None
+
+async def compact_preferences(db, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Compact all user preference documents in batches"""
+    now = datetime.now()
+    stats = {"scanned": 0, "compacted": 0}
+    operations = []
+    invalidations = []
+    
+    cursor = db.users.find(
+        {"preferences.0": {"$exists": True}},
+        {"preferences": 1, "updatedAt": 1, "auth0Id": 1}
+    ).batch_size(batch_size)
+    
+    async for user in cursor:
+        stats["scanned"] += 1
+        compacted = compact_user_preferences(user, now)
+        if compacted is None:
+            continue
+        
+        stats["compacted"] += 1
+        operations.append(UpdateOne({"_id": user["_id"]}, {"$set": {"preferences": compacted}}))
+        if user.get("auth0Id"):
+            invalidations.append(user["auth0Id"])
+        
+        if len(operations) >= batch_size:
+            await _flush(db, operations, invalidations, dry_run)
+            operations, invalidations = [], []
+    
+    await _flush(db, operations, invalidations, dry_run)
+    logger.info(f"Compaction finished: {stats['compacted']} of {stats['scanned']} users compacted")
+    return stats
+
+async def _flush(db, operations, invalidations, dry_run: bool):
+    """Write a batch of compacted documents and invalidate their caches"""
+    if not operations or dry_run:
+        return
+    await db.users.bulk_write(operations, ordered=False)
+    for auth0_id in invalidations:
+        await invalidate_cache(f"{CACHE_KEYS['PREFERENCES']}{auth0_id}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compact stored user preferences")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    
+    db = await connect_to_mongodb()
+    try:
+        await compact_preferences(db, args.batch_size, args.dry_run)
+    finally:
+        await close_mongodb_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,16 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.router import api_router
 from app.db.mongodb import connect_to_mongodb, close_mongodb_connection
+from app.db.indexes import ensure_indexes
+from app.utils.redis_util import start_redis_monitor, stop_redis_monitor
+from app.core.serving import mark_ready
+from app.core.metrics import REQUEST_LATENCY, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.utils.serialization import FastJSONResponse
+from app.services.taxonomyService import get_taxonomy_service
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -10,6 +18,7 @@ app = FastAPI(
     version=settings.VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -19,11 +28,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-Id"],
 )
 
+# Opt-in per-request profiling (no-op unless requested or sampled)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency histogram, labelled by route template to keep cardinality bounded
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=str(status)
+        ).observe(time.perf_counter() - start)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 # Create simple root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -35,10 +71,18 @@ async def root():
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_db_client():
-    await connect_to_mongodb()
+    db = await connect_to_mongodb()
+    await ensure_indexes(db)
+    start_redis_monitor()
+    # Build the taxonomy index before accepting traffic
+    app.state.taxonomy = await get_taxonomy_service(db)
+    app.state.taxonomy.start_watcher(settings.TAXONOMY_WATCH_INTERVAL)
+    mark_ready()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await app.state.taxonomy.stop_watcher()
+    await stop_redis_monitor()
     await close_mongodb_connection()
 
 if __name__ == "__main__":
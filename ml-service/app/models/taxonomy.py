@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class TaxonomyAttribute(BaseModel):
@@ -18,4 +18,12 @@ class TaxonomyCategory(BaseModel):
 class Taxonomy(BaseModel):
     """Complete taxonomy definition with categories"""
     categories: List[TaxonomyCategory]
-    version: str
\ No newline at end of file
+    version: str
+
+class TaxonomyExtension(BaseModel):
+    """Store-specific additions layered on the global taxonomy"""
+    version: str
+    # New store categories, ids prefixed "{store_id}:"; parent_id may reference a global category
+    categories: List[TaxonomyCategory] = []
+    # Extra attributes or values for global categories, keyed by category id
+    attributes: Dict[str, List[TaxonomyAttribute]] = {}
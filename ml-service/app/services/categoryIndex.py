@@ -0,0 +1,107 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CategoryIndex(ABC):
+    """Nearest-category lookup over L2-normalized category vectors"""
+
+    kind = "base"
+
+    def __init__(self, category_ids: List[str], matrix: np.ndarray):
+        self.category_ids = category_ids
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.category_ids)
+
+    @abstractmethod
+    def search(self, query: np.ndarray, k: int = 1) -> List[Tuple[str, float]]:
+        """Return the top-k (category_id, cosine score) pairs for a normalized query"""
+
+    def search_batch(self, queries: np.ndarray) -> List[str]:
+        """Return the best category id for each normalized query row"""
+        return [self.search(query, k=1)[0][0] for query in queries]
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first"""
+        if k >= len(scores):
+            return np.argsort(-scores)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+def exact_search(category_ids: List[str], matrix: np.ndarray, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+    """Top-k (category_id, score) pairs by brute-force matrix product"""
+    scores = matrix @ query
+    return [(category_ids[i], float(scores[i])) for i in CategoryIndex._top_k(scores, k)]
+
+class ExactCategoryIndex(CategoryIndex):
+    """Brute-force matrix product; exact and fastest for small taxonomies"""
+
+    kind = "exact"
+
+    def search(self, query, k=1):
+        return exact_search(self.category_ids, self.matrix, query, k)
+
+    def search_batch(self, queries):
+        best = np.argmax(queries @ self.matrix.T, axis=1)
+        return [self.category_ids[i] for i in best]
+
+class IVFCategoryIndex(CategoryIndex):
+    """
+    Inverted-file index: categories are clustered with spherical k-means and a
+    query is scored exactly only against the members of its `nprobe` closest
+    clusters. Recall is traded for latency through `nprobe`.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, category_ids, matrix, n_lists: int = None, nprobe: int = None):
+        super().__init__(category_ids, matrix)
+        self.n_lists = n_lists or max(1, int(np.sqrt(len(category_ids))))
+        self.nprobe = min(nprobe or settings.IVF_NPROBE, self.n_lists)
+        self._train()
+
+    def _train(self):
+        """Cluster the category vectors and build the inverted lists"""
+        # Imported lazily so small taxonomies never pay for scikit-learn
+        from sklearn.cluster import MiniBatchKMeans
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=self.n_lists, n_init=3, random_state=0, batch_size=4096
+        ).fit(self.matrix)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        self.centroids = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        self.lists = [np.where(kmeans.labels_ == i)[0] for i in range(self.n_lists)]
+
+    def search(self, query, k=1):
+        probes = self._top_k(self.centroids @ query, self.nprobe)
+        candidates = np.concatenate([self.lists[i] for i in probes])
+        if len(candidates) < min(k, len(self.category_ids)):
+            # Probed lists are empty or too small; scan everything rather than miss
+            return exact_search(self.category_ids, self.matrix, query, k)
+        scores = self.matrix[candidates] @ query
+        return [
+            (self.category_ids[candidates[i]], float(scores[i]))
+            for i in self._top_k(scores, k)
+        ]
+
+def build_category_index(category_ids: List[str], matrix: np.ndarray) -> CategoryIndex:
+    """Pick the index type for a taxonomy from CATEGORY_INDEX_TYPE and its size"""
+    index_type = settings.CATEGORY_INDEX_TYPE
+    if index_type == "auto":
+        index_type = "ivf" if len(category_ids) >= settings.ANN_MIN_CATEGORIES else "exact"
+
+    if index_type == "ivf":
+        try:
+            index = IVFCategoryIndex(category_ids, matrix)
+            logger.info(f"Built IVF category index: {len(index)} categories, "
+                        f"{index.n_lists} lists, nprobe={index.nprobe}")
+            return index
+        except Exception as e:
+            logger.error(f"Failed to build IVF index, falling back to exact: {str(e)}")
+    return ExactCategoryIndex(category_ids, matrix)
@@ -1,26 +1,64 @@
-from app.models.preferences import UserDataEntry, UserPreferences, UserPreference
+from app.models.preferences import UserDataEntry, UserPreference
+import asyncio
+import time
+from contextlib import nullcontext
 from datetime import datetime
 from fastapi import HTTPException
 from bson import ObjectId
 import logging
-from app.utils.redis_util import invalidate_cache, CACHE_KEYS
+from app.utils.redis_util import (
+    invalidate_cache, get_cache, set_cache, claim_cache, delete_cache, CACHE_KEYS, CACHE_TTL
+)
 from typing import List, Dict, Any
 from app.services.taxonomyService import get_taxonomy_service
+from app.utils.preference_utils import apply_decay, prune_preferences, payload_hash
 from collections import defaultdict
+from app.core.config import settings
+from app.core.metrics import timed, PROCESSING_LATENCY
+from app.utils.serialization import dumps_str, loads
 
 logger = logging.getLogger(__name__)
 
-async def process_user_data(data: UserDataEntry, db) -> UserPreferences:
-    """Process user data and update their preferences"""
+async def process_user_data(data: UserDataEntry, db, checked_key: str = None,
+                            admission=None, priority: int = None) -> Dict[str, Any]:
+    """
+    Process user data and update their preferences (UserPreferences-shaped dict).
+    Callers that already looked up the processed result pass its key as
+    `checked_key` to skip the repeat lookup. With an `admission` controller, a
+    slot is taken only once this request owns the payload claim, so duplicates
+    waiting on another copy never hold one.
+    """
     
-    # Extract user info
+    user_id = data.metadata.get("userId") if data.metadata else None
+    logger.info(f"Processing data for user {user_id or data.email}, type: {data.data_type}")
+    
+    # Short-circuit retries and duplicate uploads of the same payload
+    processed_key = checked_key or processed_payload_key(data)
+    if checked_key is None:
+        prior_result = await get_processed_result(data, db, processed_key)
+        if prior_result:
+            return prior_result
+    
+    # Claim the payload so a concurrent retry (on any worker) waits instead of blending it twice
+    claim_key = CACHE_KEYS["PROCESSING_CLAIM"] + processed_key[len(CACHE_KEYS["PROCESSED_PAYLOAD"]):]
+    prior_result = await claim_payload(data, db, processed_key, claim_key)
+    if prior_result:
+        return prior_result
+    
+    try:
+        async with admission.admit(priority) if admission else nullcontext():
+            return await _process_claimed(data, db, processed_key)
+    finally:
+        # The processed record (on success) now answers duplicates; a rejection frees the claim for retries
+        await delete_cache([claim_key])
+
+async def _process_claimed(data: UserDataEntry, db, processed_key: str) -> Dict[str, Any]:
+    """Blend a claimed payload into the user's preferences"""
     user_id = data.metadata.get("userId") if data.metadata else None
     email = data.email
     data_type = data.data_type
     entries = data.entries
     
-    logger.info(f"Processing data for user {user_id or email}, type: {data_type}")
-    
     # Fetch existing user preferences from MongoDB
     user = None
     if user_id and ObjectId.is_valid(user_id):
@@ -36,34 +74,48 @@ async def process_user_data(data: UserDataEntry, db) -> UserPreferences:
     # Get current preferences from the user object
     user_preferences = user.get("preferences", [])
     
-    # Convert to dictionary for easier updates
-    preference_dict = {pref["category"]: pref for pref in user_preferences}
+    # Convert to dictionary for easier updates, decaying stored scores to now
+    now = datetime.now()
+    preference_dict = {
+        pref["category"]: apply_decay(pref, now, user.get("updatedAt"))
+        for pref in user_preferences
+    }
     
-    # Get taxonomy service
+    # Get taxonomy service, scoped to the submitting store's extension if it has one
     taxonomy = await get_taxonomy_service(db)
+    store_id = data.metadata.get("storeId") if data.metadata else None
+    store_index = await taxonomy.get_store_index(store_id)
     
     # Process entries based on data type
-    try:
-        if data_type == "purchase":
-            await process_purchase_data(entries, preference_dict, taxonomy)
-        elif data_type == "search":
-            await process_search_data(entries, preference_dict, taxonomy)
-        else:
-            logger.warning(f"Unknown data type: {data_type}")
-    except Exception as e:
-        logger.error(f"Error processing {data_type} data: {str(e)}")
-        # Fall back to using embedding model for all data
+    with timed(PROCESSING_LATENCY, data_type=data_type):
         try:
-            await process_with_embeddings(entries, data_type, preference_dict, taxonomy)
-        except Exception as fallback_error:
-            logger.error(f"Fallback processing also failed: {str(fallback_error)}")
-            raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+            if data_type == "purchase":
+                await process_purchase_data(entries, preference_dict, taxonomy)
+            elif data_type == "search":
+                await process_search_data(entries, preference_dict, taxonomy, store_id)
+            else:
+                logger.warning(f"Unknown data type: {data_type}")
+        except Exception as e:
+            logger.error(f"Error processing {data_type} data: {str(e)}")
+            # Fall back to using embedding model for all data
+            try:
+                await process_with_embeddings(entries, data_type, preference_dict, taxonomy, store_id)
+            except Exception as fallback_error:
+                logger.error(f"Fallback processing also failed: {str(fallback_error)}")
+                raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
     
     # Convert preference_dict back to list
     updated_preferences = list(preference_dict.values())
     
     # Add normalization before database update
-    normalized_preferences = await normalize_categories(updated_preferences, taxonomy)
+    normalized_preferences = await normalize_categories(updated_preferences, taxonomy, store_index)
+    
+    # Keep the document bounded: drop weak signals and cap categories/attribute values
+    normalized_preferences = prune_preferences(normalized_preferences)
+    
+    # Every stored score is now rebased to the current time
+    for pref in normalized_preferences:
+        pref["lastUpdated"] = now
     
     # Update user preferences in database with normalized data
     await db.users.update_one(
@@ -71,12 +123,83 @@ async def process_user_data(data: UserDataEntry, db) -> UserPreferences:
         {
             "$set": {
                 "preferences": normalized_preferences,
-                "updatedAt": datetime.now()
+                "updatedAt": now
             }
         }
     )
     
     # Update the userData collection's processedStatus to "processed"
+    await mark_processed(db, email)
+    
+    # Invalidate user preferences cache using auth0Id
+    if user.get("auth0Id"):
+        auth0_id = user["auth0Id"]
+        await invalidate_cache(f"{CACHE_KEYS['PREFERENCES']}{auth0_id}")
+        logger.info(f"Invalidated preferences cache for user {auth0_id}")
+    
+    # Return updated preferences in the UserPreferences shape
+    result = preferences_response(user["_id"], normalized_preferences, now)
+    
+    # Remember this payload so duplicates are not blended in twice
+    await set_cache(processed_key, dumps_str(result), {"EX": CACHE_TTL["PROCESSED_PAYLOAD"]})
+    
+    return result
+
+async def claim_payload(data: UserDataEntry, db, processed_key: str, claim_key: str):
+    """
+    Claim a payload for processing. Returns None once claimed, or the result of
+    the copy that held the claim if it finishes within PROCESSING_CLAIM_WAIT.
+    """
+    deadline = time.monotonic() + settings.PROCESSING_CLAIM_WAIT
+    while True:
+        if await claim_cache(claim_key, settings.PROCESSING_CLAIM_TTL):
+            # The previous holder may have finished between our check and the claim
+            prior_result = await get_processed_result(data, db, processed_key)
+            if prior_result:
+                await delete_cache([claim_key])
+            return prior_result
+        
+        await asyncio.sleep(0.1)
+        prior_result = await get_processed_result(data, db, processed_key)
+        if prior_result:
+            return prior_result
+        if time.monotonic() >= deadline:
+            logger.info(f"Duplicate payload for {data.email} is still processing")
+            raise HTTPException(
+                status_code=409,
+                detail="An identical payload is still being processed",
+                headers={"Retry-After": str(max(1, int(settings.PROCESSING_CLAIM_WAIT)))}
+            )
+
+def processed_payload_key(data: UserDataEntry) -> str:
+    """Cache key recording the result of an already processed payload"""
+    return f"{CACHE_KEYS['PROCESSED_PAYLOAD']}{data.email}:{payload_hash(data)}"
+
+async def get_processed_result(data: UserDataEntry, db, processed_key: str = None):
+    """Prior result for a duplicate payload, or None; cheap enough to run before admission"""
+    prior_result = await get_cache(processed_key or processed_payload_key(data))
+    if not prior_result:
+        return None
+    logger.info(f"Duplicate payload for {data.email}, returning prior result")
+    await mark_processed(db, data.email)
+    return loads(prior_result)
+
+def preferences_response(user_id, preferences: List[Dict[str, Any]], updated_at: datetime) -> Dict[str, Any]:
+    """
+    UserPreferences-shaped dict built straight from stored preferences; avoids
+    constructing models that FastAPI validates again against response_model.
+    """
+    return {
+        "user_id": str(user_id),
+        "preferences": [
+            {"category": item["category"], "score": item["score"], "attributes": item.get("attributes")}
+            for item in preferences
+        ],
+        "updated_at": updated_at
+    }
+
+async def mark_processed(db, email: str):
+    """Mark pending userData entries as processed"""
     try:
         result = await db.userData.update_one(
             {
@@ -88,25 +211,6 @@ async def process_user_data(data: UserDataEntry, db) -> UserPreferences:
         logger.info(f"Updated userData status to 'processed' for {email}, modified: {result.modified_count}")
     except Exception as e:
         logger.error(f"Failed to update userData status: {str(e)}")
-    
-    # Invalidate user preferences cache using auth0Id
-    if user.get("auth0Id"):
-        auth0_id = user["auth0Id"]
-        await invalidate_cache(f"{CACHE_KEYS['PREFERENCES']}{auth0_id}")
-        logger.info(f"Invalidated preferences cache for user {auth0_id}")
-    
-    # Return updated preferences in the expected format
-    return UserPreferences(
-        user_id=str(user["_id"]),
-        preferences=[
-            UserPreference(
-                category=item["category"], 
-                score=item["score"],
-                attributes=item.get("attributes")
-            ) for item in normalized_preferences
-        ],
-        updated_at=datetime.now()
-    )
 
 async def process_purchase_data(entries, preference_dict, taxonomy):
     """Process purchase data using rule-based system"""
@@ -153,33 +257,40 @@ async def process_purchase_data(entries, preference_dict, taxonomy):
             
             # Process attributes
             if category in attribute_counts:
-                for attr_name, attr_values in attribute_counts[category].items():
-                    # Get total for this attribute
-                    attr_total = sum(attr_values.values())
-                    
-                    # Create attribute distribution
-                    if "attributes" not in preference_dict[category]:
-                        preference_dict[category]["attributes"] = {}
-                        
-                    if attr_name not in preference_dict[category]["attributes"]:
-                        preference_dict[category]["attributes"][attr_name] = {}
-                        
-                    # Calculate normalized values
-                    for value, value_count in attr_values.items():
-                        normalized_score = value_count / attr_total
-                        
-                        # Use exponential moving average if attribute value exists
-                        if value in preference_dict[category]["attributes"][attr_name]:
-                            old_value = preference_dict[category]["attributes"][attr_name][value]
-                            preference_dict[category]["attributes"][attr_name][value] = \
-                                alpha * normalized_score + (1 - alpha) * old_value
-                        else:
-                            preference_dict[category]["attributes"][attr_name][value] = normalized_score
+                blend_attributes(preference_dict[category], attribute_counts[category], alpha=0.3)
+
+def blend_attributes(preference, attribute_counts, alpha):
+    """Blend observed attribute value counts into a preference's attribute distribution"""
+    if not preference.get("attributes"):
+        preference["attributes"] = {}
+        
+    for attr_name, attr_values in attribute_counts.items():
+        # Get total for this attribute
+        attr_total = sum(attr_values.values())
+        if attr_total <= 0:
+            continue
+        
+        # Create attribute distribution
+        if attr_name not in preference["attributes"]:
+            preference["attributes"][attr_name] = {}
+        current = preference["attributes"][attr_name]
+            
+        # Calculate normalized values
+        for value, value_count in attr_values.items():
+            normalized_score = value_count / attr_total
+            
+            # Use exponential moving average if attribute value exists
+            if value in current:
+                current[value] = alpha * normalized_score + (1 - alpha) * current[value]
+            else:
+                current[value] = normalized_score
 
-async def process_search_data(entries, preference_dict, taxonomy):
+async def process_search_data(entries, preference_dict, taxonomy, store_id=None):
     """Process search data using embedding model"""
     # Dictionary to track category relevance from searches
     search_relevance = defaultdict(float)
+    # Attribute values inferred from query text, weighted by match score
+    attribute_relevance = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
     
     for entry in entries:
         query = entry.get("query")
@@ -195,11 +306,14 @@ async def process_search_data(entries, preference_dict, taxonomy):
         
         # Use embeddings to match query to category
         try:
-            match_result = await taxonomy.match_category(query)
+            match_result = await taxonomy.match_category(query, store_id)
             if match_result["threshold_met"]:
                 category = match_result["category"]
                 # Weight by confidence score
                 search_relevance[category] += match_result["score"]
+                for attr_name, values in (match_result.get("attributes") or {}).items():
+                    for value, value_score in values.items():
+                        attribute_relevance[category][attr_name][value] += value_score
         except Exception as e:
             logger.error(f"Error matching query '{query}': {str(e)}")
     
@@ -223,8 +337,11 @@ async def process_search_data(entries, preference_dict, taxonomy):
                     alpha = 0.2  # Lower weight for searches vs purchases
                     old_score = preference_dict[category]["score"]
                     preference_dict[category]["score"] = alpha * score + (1 - alpha) * old_score
+                
+                if category in attribute_relevance:
+                    blend_attributes(preference_dict[category], attribute_relevance[category], alpha=0.2)
 
-async def process_with_embeddings(entries, data_type, preference_dict, taxonomy):
+async def process_with_embeddings(entries, data_type, preference_dict, taxonomy, store_id=None):
     """Fallback processing using embeddings for all data types"""
     logger.info("Using embedding fallback processing")
     
@@ -238,7 +355,7 @@ async def process_with_embeddings(entries, data_type, preference_dict, taxonomy)
         # Process each item name
         for item_name in items:
             try:
-                match_result = await taxonomy.match_category(item_name)
+                match_result = await taxonomy.match_category(item_name, store_id)
                 if match_result["threshold_met"]:
                     category = match_result["category"]
                     score = match_result["score"]
@@ -255,14 +372,18 @@ async def process_with_embeddings(entries, data_type, preference_dict, taxonomy)
                             preference_dict[category]["score"],
                             score * 0.8  # Reduce confidence for embedding-based matches
                         )
+                    
+                    # Attribute values inferred from the item name
+                    if match_result.get("attributes"):
+                        blend_attributes(preference_dict[category], match_result["attributes"], alpha=0.2)
             except Exception as e:
                 logger.error(f"Error processing item '{item_name}': {str(e)}")
     
     # For search data, same as regular processing
     elif data_type == "search":
-        await process_search_data(entries, preference_dict, taxonomy)
+        await process_search_data(entries, preference_dict, taxonomy, store_id)
 
-async def normalize_categories(preferences, taxonomy):
+async def normalize_categories(preferences, taxonomy, store_index=None):
     """Ensure all categories use IDs instead of names"""
     normalized = []
     
@@ -270,6 +391,8 @@ async def normalize_categories(preferences, taxonomy):
     name_to_id = {}
     for cat in taxonomy.taxonomy.categories:
         name_to_id[cat.name.lower()] = cat.id
+    if store_index is not None:
+        name_to_id.update(store_index.category_names)
     
     for pref in preferences:
         category = pref["category"]
@@ -280,17 +403,19 @@ async def normalize_categories(preferences, taxonomy):
     
     return normalized
 
-async def update_user_preferences(auth0_id: str, email: str, preferences: List[UserPreference], db) -> UserPreferences:
+async def update_user_preferences(auth0_id: str, email: str, preferences: List[UserPreference], db,
+                                  store_id: str = None) -> Dict[str, Any]:
     """Update user preferences directly"""
     
     logger.info(f"Processing preference update for user {auth0_id}")
     
     # Get taxonomy service for validation
     taxonomy = await get_taxonomy_service(db)
+    store_index = await taxonomy.get_store_index(store_id)
     
-    # Validate preferences against taxonomy
+    # Validate preferences against taxonomy (and the store's extension, if any)
     try:
-        taxonomy.validate_preferences(preferences)
+        taxonomy.validate_preferences(preferences, store_index)
     except ValueError as e:
         logger.error(f"Preference validation failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -304,13 +429,17 @@ async def update_user_preferences(auth0_id: str, email: str, preferences: List[U
             logger.error(f"User not found: {email}")
             raise HTTPException(status_code=404, detail="User not found")
     
-    # Update user preferences
+    # Update user preferences, stamping each category so decay starts from now
+    now = datetime.now()
+    stored_preferences = prune_preferences(
+        [{**pref.model_dump(), "lastUpdated": now} for pref in preferences]
+    )
     update_result = await db.users.update_one(
         {"_id": user["_id"]},
         {
             "$set": {
-                "preferences": [pref.dict() for pref in preferences],
-                "updatedAt": datetime.now()
+                "preferences": stored_preferences,
+                "updatedAt": now
             }
         }
     )
@@ -322,8 +451,4 @@ async def update_user_preferences(auth0_id: str, email: str, preferences: List[U
     await invalidate_cache(f"{CACHE_KEYS['PREFERENCES']}{auth0_id}")
     
     # Return updated preferences
-    return UserPreferences(
-        user_id=str(user["_id"]),
-        preferences=preferences,
-        updated_at=datetime.now()
-    )
\ No newline at end of file
+    return preferences_response(user["_id"], stored_preferences, now)
\ No newline at end of file
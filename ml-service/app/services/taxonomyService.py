@@ -1,5 +1,10 @@
 import yaml
 import json
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -7,8 +12,19 @@ from fastapi import HTTPException
 import logging
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from app.models.taxonomy import TaxonomyAttribute, TaxonomyCategory, Taxonomy
-from app.utils.redis_util import get_cache, set_cache, get_cache_json, set_cache_json, CACHE_KEYS, CACHE_TTL
+from app.models.taxonomy import TaxonomyAttribute, TaxonomyCategory, Taxonomy, TaxonomyExtension
+from app.core.config import settings
+from app.core.profiling import profile_in_thread
+from app.core.metrics import (
+    timed, ENCODE_LATENCY, ENCODE_BATCH_SIZE, TAXONOMY_INIT_DURATION, EMBEDDING_CACHE_LOOKUPS
+)
+from app.db.mongodb import mongo_breaker
+from app.services.categoryIndex import build_category_index
+from app.utils.embedding_store import open_embedding_store
+from app.utils.redis_util import (
+    get_cache, set_cache, get_cache_json, set_cache_json, add_to_set, get_set_members, delete_cache,
+    CACHE_KEYS, CACHE_TTL
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,30 +34,63 @@ class TaxonomyService:
         self.taxonomy = None
         self.embedding_model = None
         self.category_embeddings = {}
+        self.category_ids = []
+        self.category_matrix = None
+        self.category_index = None
+        self.category_hashes = {}
+        # Changes whenever the global categories do; scopes cached store searches
+        self.categories_fingerprint = ""
+        self.attribute_index = {}
+        self.embedding_store = None
+        self.source_updated_at = None
+        self._reload_lock = asyncio.Lock()
+        self._watch_task = None
+        # Bounded LRU of per-store extension indexes (None caches "no extension")
+        self._store_indexes = OrderedDict()
+        self._store_builds = {}
         
     async def initialize(self):
         """Initialize taxonomy from file and DB"""
+        with timed(TAXONOMY_INIT_DURATION):
+            self.taxonomy, self.source_updated_at = await self._load_taxonomy()
+            
+            # Initialize embedding model and category matrix
+            await self._initialize_embeddings()
+        
+    async def _load_taxonomy(self):
+        """Load the current taxonomy, preferring the DB document over the YAML file"""
+        taxonomy = None
+        updated_at = None
+        
         # Try loading from DB first
-        if self.db is not None:  # Changed from 'if self.db:'
-            cached = await self.db.taxonomy.find_one({"current": True})
-            if cached:
-                self.taxonomy = Taxonomy(**cached["data"])
-                logger.info(f"Loaded taxonomy from DB: {self.taxonomy.version}")
+        # Skip the DB entirely while its circuit breaker is open (degraded mode)
+        use_db = self.db is not None and mongo_breaker.is_available
+        if use_db:
+            try:
+                cached = await self.db.taxonomy.find_one({"current": True})
+                if cached:
+                    taxonomy = Taxonomy(**cached["data"])
+                    updated_at = cached.get("updated_at")
+                    logger.info(f"Loaded taxonomy from DB: {taxonomy.version}")
+            except Exception as e:
+                logger.error(f"Failed to load taxonomy from DB: {str(e)}")
+                use_db = False
                 
         # If not in DB or load failed, use file
-        if not self.taxonomy:
-            self._load_from_file()
+        if not taxonomy:
+            taxonomy = self._load_from_file()
             
             # Save to DB if available
-            if self.db is not None:
+            if use_db:
+                # Mongo keeps milliseconds; match it so the watcher's comparison holds
+                now = datetime.now()
+                updated_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
                 await self.db.taxonomy.update_one(
                     {"current": True},
-                    {"$set": {"data": self.taxonomy.dict(), "updated_at": datetime.now()}},
+                    {"$set": {"data": taxonomy.model_dump(), "updated_at": updated_at}},
                     upsert=True
                 )
-        
-        # Initialize embedding model (try Redis cache first)
-        await self._initialize_embeddings()
+        return taxonomy, updated_at
         
     def _load_from_file(self):
         """Load taxonomy from YAML file"""
@@ -49,71 +98,301 @@ class TaxonomyService:
         try:
             with open(file_path, 'r') as file:
                 data = yaml.safe_load(file)
-                self.taxonomy = Taxonomy(**data)
-                logger.info(f"Loaded taxonomy from file: {self.taxonomy.version}")
+                taxonomy = Taxonomy(**data)
+                logger.info(f"Loaded taxonomy from file: {taxonomy.version}")
+                return taxonomy
         except Exception as e:
             logger.error(f"Failed to load taxonomy: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to load taxonomy")
             
     async def _initialize_embeddings(self):
-        """Initialize embedding model for search processing"""
-        # Try to get embeddings from Redis cache first
-        cache_key = f"{CACHE_KEYS['TAXONOMY_EMBEDDINGS']}all"
-        cached_embeddings = await get_cache_json(cache_key)
-        
-        if cached_embeddings:
-            try:
-                # Convert from list back to numpy arrays
-                self.category_embeddings = {k: np.array(v) for k, v in cached_embeddings.items()}
-                logger.info(f"Loaded embeddings from Redis cache for {len(self.category_embeddings)} categories")
-                
-                # Load the model but skip generating embeddings
-                model_name = "all-MiniLM-L6-v2"
-                self.embedding_model = SentenceTransformer(model_name)
-                return
-            except Exception as e:
-                logger.error(f"Failed to load embeddings from cache: {str(e)}")
-                # Continue to generate embeddings
-                
+        """Initialize embedding model and the category matrix for search processing"""
         try:
-            model_name = "all-MiniLM-L6-v2"  # Good balance of speed and performance
-            # Specify a writable cache directory inside the container
-            cache_dir = "/app/model_cache"
-            self.embedding_model = SentenceTransformer(model_name, cache_folder=cache_dir)
+            self.embedding_model = get_embedding_model()
+            self.embedding_store = open_embedding_store(
+                settings.EMBEDDING_STORE_PATH, settings.EMBEDDING_MODEL_NAME
+            )
             
-            # Generate embeddings for all categories
-            for category in self.taxonomy.categories:
-                # Create rich text from category name and description
-                text = f"{category.name}"
-                if category.description:
-                    text += f": {category.description}"
-                
-                # Add attribute information
-                for attr in category.attributes:
-                    text += f" {attr.name} "
-                    text += " ".join(attr.values[:10])  # Use only first 10 values
-                
-                # Generate embedding
-                self.category_embeddings[category.id] = self.embedding_model.encode(text)
-                
-            logger.info(f"Initialized embeddings for {len(self.category_embeddings)} categories")
+            # Reuse the matrix preloaded by the master process when the taxonomy matches
+            shared = get_shared_category_matrix(self.taxonomy)
+            if shared is not None:
+                self.category_ids, self.category_matrix = shared
+                self.category_embeddings = dict(zip(self.category_ids, self.category_matrix))
+                self.category_index = build_category_index(self.category_ids, self.category_matrix)
+            else:
+                # Category vectors come from the persistent store when unchanged
+                texts = [self._category_text(category) for category in self.taxonomy.categories]
+                vectors = self._encode(texts)
+                self.category_embeddings = {
+                    category.id: vector for category, vector in zip(self.taxonomy.categories, vectors)
+                }
+                self._build_category_matrix()
+            self.category_hashes = {
+                category.id: self._text_hash(self._category_text(category))
+                for category in self.taxonomy.categories
+            }
+            self.categories_fingerprint = self._hashes_fingerprint(self.category_hashes)
+            self.attribute_index = self._build_attribute_index(
+                {category.id: category.attributes for category in self.taxonomy.categories}
+            )
             
-            # Cache embeddings in Redis
-            # Convert numpy arrays to lists for JSON serialization
-            cache_data = {k: v.tolist() for k, v in self.category_embeddings.items()}
-            await set_cache_json(cache_key, cache_data, {"EX": CACHE_TTL["TAXONOMY_EMBEDDINGS"]})
-            logger.info("Cached embeddings in Redis")
+            logger.info(f"Initialized embeddings for {len(self.category_embeddings)} categories")
             
         except Exception as e:
             logger.error(f"Failed to initialize embeddings: {str(e)}")
             # Continue without embeddings, we'll use rule-based only
             
-    def validate_preferences(self, preferences):
-        """Validate preference data against taxonomy"""
+    @staticmethod
+    def _category_text(category: TaxonomyCategory) -> str:
+        """Rich text used to embed a category"""
+        # Create rich text from category name and description
+        text = f"{category.name}"
+        if category.description:
+            text += f": {category.description}"
+        
+        # Add attribute information
+        for attr in category.attributes:
+            text += f" {attr.name} "
+            text += " ".join(attr.values[:10])  # Use only first 10 values
+        return text
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, consulting the persistent store and encoding only misses in one batch"""
+        stored = self.embedding_store.get_many(texts) if self.embedding_store else {}
+        misses = [text for text in dict.fromkeys(texts) if text not in stored]
+        EMBEDDING_CACHE_LOOKUPS.labels(layer="l2", result="hit").inc(len(stored))
+        EMBEDDING_CACHE_LOOKUPS.labels(layer="l2", result="miss").inc(len(misses))
+        
+        if misses:
+            ENCODE_BATCH_SIZE.observe(len(misses))
+            with timed(ENCODE_LATENCY):
+                encoded = self.embedding_model.encode(misses)
+            fresh = {text: np.asarray(vector, dtype=np.float32) for text, vector in zip(misses, encoded)}
+            if self.embedding_store:
+                try:
+                    self.embedding_store.put_many(fresh)
+                except Exception as e:
+                    logger.error(f"Failed to persist embeddings: {str(e)}")
+            stored.update(fresh)
+            
+        return np.vstack([stored[text] for text in texts])
+    
+    @staticmethod
+    def _attribute_text(attr_name: str, value: str) -> str:
+        """Text used to embed a single attribute value"""
+        return f"{attr_name.replace('_', ' ')}: {value}"
+    
+    def _build_attribute_index(self, attributes_by_category: Dict[str, List[TaxonomyAttribute]]) -> Dict[str, tuple]:
+        """
+        Precompute a normalized attribute-value matrix per category, so a
+        matched query can be scored against every value in one product.
+        """
+        labels = {}
+        texts = []
+        for category_id, attributes in attributes_by_category.items():
+            pairs = [(attr.name, value) for attr in attributes for value in attr.values]
+            if pairs:
+                labels[category_id] = pairs
+                texts.extend(self._attribute_text(name, value) for name, value in pairs)
+        if not texts:
+            return {}
+        
+        # One batched lookup; values shared across categories are encoded once
+        vectors = self._encode(texts)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        
+        index = {}
+        offset = 0
+        for category_id, pairs in labels.items():
+            index[category_id] = (pairs, vectors[offset:offset + len(pairs)])
+            offset += len(pairs)
+        return index
+    
+    def _match_attributes(self, category_id: str, query_embedding: np.ndarray,
+                          store_index=None) -> Dict[str, Dict[str, float]]:
+        """Best-scoring value per attribute of a category for a normalized query vector"""
+        sources = [self.attribute_index]
+        if store_index is not None:
+            sources.append(store_index.attribute_index)
+        
+        best = {}
+        for attribute_index in sources:
+            if category_id not in attribute_index:
+                continue
+            pairs, matrix = attribute_index[category_id]
+            scores = matrix @ query_embedding
+            for (attr_name, value), score in zip(pairs, scores):
+                if score >= settings.ATTRIBUTE_MATCH_THRESHOLD and score > best.get(attr_name, (None, -1.0))[1]:
+                    best[attr_name] = (value, float(score))
+        return {attr_name: {value: score} for attr_name, (value, score) in best.items()}
+    
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """Hash of a category's embedded text, used to detect edits"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _stack_category_matrix(embeddings: Dict[str, np.ndarray]):
+        """Stack L2-normalized category vectors so matching is a single matrix product"""
+        category_ids = list(embeddings.keys())
+        matrix = np.vstack([embeddings[cid] for cid in category_ids]).astype(np.float32)
+        return category_ids, matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    
+    def _build_category_matrix(self):
+        """Rebuild the category matrix and index from category_embeddings"""
+        self.category_ids, self.category_matrix = self._stack_category_matrix(self.category_embeddings)
+        self.category_index = build_category_index(self.category_ids, self.category_matrix)
+    
+    async def reload(self) -> dict:
+        """
+        Reload the taxonomy, re-embedding only categories whose text changed.
+        
+        The new matrix is built off to the side and swapped in without an
+        await in between, so in-flight requests see either the old or the new
+        index, never a mix.
+        """
+        async with self._reload_lock:
+            taxonomy, updated_at = await self._load_taxonomy()
+            texts = {category.id: self._category_text(category) for category in taxonomy.categories}
+            hashes = {cid: self._text_hash(text) for cid, text in texts.items()}
+            
+            added = [cid for cid in hashes if cid not in self.category_hashes]
+            changed = [cid for cid in hashes if cid in self.category_hashes and hashes[cid] != self.category_hashes[cid]]
+            removed = [cid for cid in self.category_hashes if cid not in hashes]
+            stale = added + changed
+            
+            # Encode off the event loop so search requests keep being served
+            fresh = {}
+            if stale:
+                vectors = await asyncio.to_thread(self._encode, [texts[cid] for cid in stale])
+                fresh = dict(zip(stale, vectors))
+            embeddings = {
+                cid: fresh[cid] if cid in fresh else self.category_embeddings[cid]
+                for cid in hashes
+            }
+            category_ids, category_matrix = self._stack_category_matrix(embeddings)
+            category_index = await asyncio.to_thread(build_category_index, category_ids, category_matrix)
+            # Unchanged attribute values are store hits, so this only encodes new values
+            attribute_index = await asyncio.to_thread(
+                self._build_attribute_index,
+                {category.id: category.attributes for category in taxonomy.categories}
+            )
+            
+            # Atomic swap
+            previous_ids = self.category_ids
+            self.taxonomy = taxonomy
+            self.source_updated_at = updated_at
+            self.category_embeddings = embeddings
+            self.category_ids, self.category_matrix = category_ids, category_matrix
+            self.category_index = category_index
+            self.attribute_index = attribute_index
+            self.category_hashes = hashes
+            self.categories_fingerprint = self._hashes_fingerprint(hashes)
+            
+            invalidated = 0
+            if stale or removed:
+                invalidated = await self._invalidate_search_cache(previous_ids, changed + removed, bool(stale))
+            
+            summary = {
+                "version": taxonomy.version,
+                "added": added,
+                "changed": changed,
+                "removed": removed,
+                "invalidated_searches": invalidated,
+            }
+            logger.info(f"Reloaded taxonomy {taxonomy.version}: {len(added)} added, "
+                        f"{len(changed)} changed, {len(removed)} removed, {invalidated} searches invalidated")
+            return summary
+    
+    @staticmethod
+    def _hashes_fingerprint(hashes: Dict[str, str]) -> str:
+        """Short digest of every category id and text hash"""
+        digest = hashlib.sha256()
+        for cid in sorted(hashes):
+            digest.update(f"{cid}\0{hashes[cid]}\0".encode("utf-8"))
+        return digest.hexdigest()[:16]
+    
+    async def _invalidate_search_cache(self, previous_ids: List[str], dropped_ids: List[str], rescore: bool) -> int:
+        """
+        Invalidate only the cached searches a taxonomy change can affect:
+        queries that matched a changed or removed category, plus queries whose
+        best match moves to a new or changed category. The latter are found by
+        re-scoring stored query vectors against the new matrix, without encoding.
+        """
+        index_key = CACHE_KEYS["TAXONOMY_SEARCH_INDEX"]
+        dropped = set(dropped_ids)
+        check_ids = previous_ids if rescore else dropped_ids
+        members = await get_set_members([f"{index_key}{cid}" for cid in check_ids])
+        
+        invalid = set()
+        kept = {}
+        for cid in check_ids:
+            for query in members.get(f"{index_key}{cid}", ()):
+                if cid in dropped:
+                    invalid.add(query)
+                else:
+                    kept[query] = cid
+        
+        if kept:
+            stored = self.embedding_store.get_many(list(kept)) if self.embedding_store else {}
+            # Queries without a stored vector cannot be re-scored; drop them to be safe
+            invalid.update(query for query in kept if query not in stored)
+            queries = [query for query in kept if query in stored]
+            if queries:
+                vectors = np.vstack([stored[query] for query in queries])
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                best = self.category_index.search_batch(vectors)
+                invalid.update(
+                    query for query, category_id in zip(queries, best) if category_id != kept[query]
+                )
+        
+        keys = [f"{CACHE_KEYS['TAXONOMY_SEARCH']}{query}" for query in invalid]
+        keys += [f"{index_key}{cid}" for cid in dropped_ids]
+        await delete_cache(keys)
+        return len(invalid)
+    
+    def start_watcher(self, interval: float):
+        """Poll the current taxonomy document and hot-reload when it changes"""
+        if self.db is not None and interval > 0 and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(interval))
+    
+    async def stop_watcher(self):
+        """Stop polling the taxonomy document"""
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+    
+    async def _watch(self, interval: float):
+        """Reload whenever the DB document's updated_at moves"""
+        while True:
+            await asyncio.sleep(interval)
+            if not mongo_breaker.is_available:
+                continue
+            try:
+                current = await self.db.taxonomy.find_one({"current": True}, {"updated_at": 1})
+                if current and current.get("updated_at") != self.source_updated_at:
+                    await self.reload()
+            except Exception as e:
+                logger.error(f"Taxonomy watcher error: {str(e)}")
+            
+    def validate_preferences(self, preferences, store_index=None):
+        """Validate preference data against taxonomy, including a store's extension if given"""
         if not self.taxonomy:
             raise ValueError("Taxonomy not initialized")
             
-        valid_categories = {cat.id: cat for cat in self.taxonomy.categories}
+        valid_categories = {
+            cat.id: {attr.name: set(attr.values) for attr in cat.attributes}
+            for cat in self.taxonomy.categories
+        }
+        if store_index is not None:
+            for category_id, attrs in store_index.valid_attributes.items():
+                merged = valid_categories.setdefault(category_id, {})
+                for attr_name, values in attrs.items():
+                    merged[attr_name] = merged.get(attr_name, set()) | values
         
         for pref in preferences:
             # Check if category exists
@@ -122,8 +401,7 @@ class TaxonomyService:
                 
             # If attributes provided, validate them
             if pref.attributes:
-                category = valid_categories[pref.category]
-                valid_attrs = {attr.name: attr.values for attr in category.attributes}
+                valid_attrs = valid_categories[pref.category]
                 
                 for attr_name, attr_values in pref.attributes.items():
                     # Check attribute exists
@@ -136,46 +414,223 @@ class TaxonomyService:
                             raise ValueError(f"Invalid value '{value}' for attribute '{attr_name}'")
         
         return True
+    
+    def _validate_extension(self, store_id: str, extension: TaxonomyExtension):
+        """
+        Check a store extension is consistent with the global taxonomy. Store
+        category ids must carry the "{store_id}:" prefix so they can never
+        collide with another store's in users' preferences.
+        """
+        global_ids = {category.id for category in self.taxonomy.categories}
+        store_ids = {category.id for category in extension.categories}
+        prefix = f"{store_id}:"
+        
+        for category in extension.categories:
+            if not category.id.startswith(prefix) or category.id == prefix:
+                raise ValueError(f"Category id '{category.id}' must start with '{prefix}'")
+            if category.id in global_ids:
+                raise ValueError(f"Category id '{category.id}' already exists in the global taxonomy")
+            if category.parent_id and category.parent_id not in global_ids | store_ids:
+                raise ValueError(f"Unknown parent '{category.parent_id}' for category '{category.id}'")
+        for category_id in extension.attributes:
+            if category_id not in global_ids:
+                raise ValueError(f"Cannot extend attributes of unknown category '{category_id}'")
+    
+    @profile_in_thread
+    def _build_store_index(self, store_id: str, extension: TaxonomyExtension) -> "StoreTaxonomyIndex":
+        """Embed a store's extension categories and attribute values"""
+        category_index = None
+        if extension.categories:
+            vectors = self._encode([self._category_text(category) for category in extension.categories])
+            embeddings = {category.id: vector for category, vector in zip(extension.categories, vectors)}
+            category_index = build_category_index(*self._stack_category_matrix(embeddings))
         
-    async def match_category(self, query_text):
+        attributes_by_category = {category.id: category.attributes for category in extension.categories}
+        attributes_by_category.update(extension.attributes)
+        attribute_index = self._build_attribute_index(attributes_by_category)
+        return StoreTaxonomyIndex(store_id, extension, category_index, attribute_index)
+    
+    async def get_store_index(self, store_id: Optional[str]):
+        """
+        Return the embedding index for a store's taxonomy extension, building
+        it lazily and keeping at most STORE_INDEX_CACHE_SIZE stores loaded.
+        Returns None when the store has no extension.
+        """
+        if not store_id:
+            return None
+        
+        loaded, store_index = self.peek_store_index(store_id)
+        if loaded:
+            return store_index
+        
+        # Share one build between concurrent requests for the same store
+        build = self._store_builds.get(store_id)
+        if build is None:
+            build = asyncio.ensure_future(self._load_store_index(store_id))
+            self._store_builds[store_id] = build
+            build.add_done_callback(lambda _: self._store_builds.pop(store_id, None))
+        # Shield the shared build from cancellation of any single waiting request
+        return await asyncio.shield(build)
+    
+    def peek_store_index(self, store_id: Optional[str]):
+        """
+        (loaded, store_index) from the store LRU without loading or building;
+        loaded is False when the store's entry is missing or expired.
+        """
+        if not store_id:
+            return True, None
+        entry = self._store_indexes.get(store_id)
+        if entry is None or time.monotonic() >= entry[0]:
+            return False, None
+        self._store_indexes.move_to_end(store_id)
+        return True, entry[1]
+    
+    async def _load_store_index(self, store_id: str):
+        """Load a store's extension from the DB and cache its index"""
+        if self.db is None or not mongo_breaker.is_available:
+            return None
+        store_index = None
+        try:
+            document = await self.db.taxonomyExtensions.find_one({"storeId": store_id})
+            if document:
+                extension = TaxonomyExtension(**document["data"])
+                store_index = await asyncio.to_thread(self._build_store_index, store_id, extension)
+        except Exception as e:
+            # Cached briefly as "no extension" so a broken extension is not rebuilt on every request
+            logger.error(f"Failed to load taxonomy extension for store {store_id}: {str(e)}")
+        self._cache_store_index(store_id, store_index)
+        return store_index
+    
+    def _cache_store_index(self, store_id: str, store_index):
+        """
+        Insert into the store LRU, evicting the least recently used stores.
+        Misses expire after STORE_INDEX_NEGATIVE_TTL; an extension registered on
+        another worker is only visible here once its entry expires.
+        """
+        ttl = settings.STORE_INDEX_TTL if store_index is not None else settings.STORE_INDEX_NEGATIVE_TTL
+        self._store_indexes[store_id] = (time.monotonic() + ttl, store_index)
+        self._store_indexes.move_to_end(store_id)
+        while len(self._store_indexes) > settings.STORE_INDEX_CACHE_SIZE:
+            self._store_indexes.popitem(last=False)
+    
+    async def register_store_extension(self, store_id: str, extension: TaxonomyExtension) -> dict:
+        """Validate, persist and index a store's taxonomy extension"""
+        self._validate_extension(store_id, extension)
+        store_index = await asyncio.to_thread(self._build_store_index, store_id, extension)
+        
+        if self.db is not None:
+            await self.db.taxonomyExtensions.update_one(
+                {"storeId": store_id},
+                {"$set": {"data": extension.model_dump(), "version": extension.version, "updated_at": datetime.now()}},
+                upsert=True
+            )
+        self._cache_store_index(store_id, store_index)
+        
+        return {
+            "store_id": store_id,
+            "version": extension.version,
+            "categories": len(extension.categories),
+            "extended_categories": len(extension.attributes),
+        }
+        
+    async def match_category(self, query_text, store_id=None):
         """Match a search query to most relevant category using embeddings"""
-        # Try to get from cache first
-        cache_key = f"{CACHE_KEYS['TAXONOMY_SEARCH']}{query_text}"
+        # Load the store index first so the cache lookup can use its version
+        await self.get_store_index(store_id)
+        cached_result = await self.cached_match(query_text, store_id)
+        if cached_result:
+            return cached_result
+        return await self.compute_match(query_text, store_id)
+    
+    def _search_cache_key(self, query_text, store_id, store_index):
+        """
+        Search cache key and scope. Store-scoped results are keyed by the
+        extension version and the global categories' fingerprint, so a global
+        reload retires them without per-category invalidation.
+        """
+        scope = f"store:{store_id}:{store_index.version}:{self.categories_fingerprint}:" if store_index else ""
+        return f"{CACHE_KEYS['TAXONOMY_SEARCH']}{scope}{query_text}", scope
+    
+    async def cached_match(self, query_text, store_id=None):
+        """
+        Cached category match for a query, or None; never touches the model.
+        Also None while the store's index is not loaded, since building it is
+        model-bound work that belongs under admission control.
+        """
+        loaded, store_index = self.peek_store_index(store_id)
+        if not loaded:
+            return None
+        cache_key, _ = self._search_cache_key(query_text, store_id, store_index)
         cached_result = await get_cache_json(cache_key)
         
         if cached_result:
+            EMBEDDING_CACHE_LOOKUPS.labels(layer="l1", result="hit").inc()
             logger.debug(f"Category match for '{query_text}' found in cache")
             return cached_result
-            
-        if not self.embedding_model or not self.category_embeddings:
+        EMBEDDING_CACHE_LOOKUPS.labels(layer="l1", result="miss").inc()
+        return None
+    
+    async def compute_match(self, query_text, store_id=None):
+        """Match a query with the model, bypassing the cache lookup, and cache the result"""
+        store_index = await self.get_store_index(store_id)
+        cache_key, scope = self._search_cache_key(query_text, store_id, store_index)
+        
+        if not self.embedding_model or self.category_index is None:
             raise ValueError("Embedding model not initialized")
-            
-        # Generate embedding for query
-        query_embedding = self.embedding_model.encode(query_text)
         
-        # Find most similar category
-        best_score = -1
-        best_category = None
+        # Encoding and scoring run off the event loop so admission control can bound them
+        result = await asyncio.to_thread(self._score_query, query_text, store_index)
         
-        for category_id, category_embedding in self.category_embeddings.items():
-            # Compute cosine similarity
-            similarity = np.dot(query_embedding, category_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(category_embedding))
-            
-            if similarity > best_score:
-                best_score = similarity
-                best_category = category_id
+        # Cache result with short TTL, indexed by category for targeted invalidation
+        await set_cache_json(cache_key, result, {"EX": CACHE_TTL["TAXONOMY_SEARCH"]})
+        if not scope:
+            await add_to_set(
+                f"{CACHE_KEYS['TAXONOMY_SEARCH_INDEX']}{result['category']}", query_text, CACHE_TTL["TAXONOMY_SEARCH"]
+            )
+        
+        return result
+    
+    @profile_in_thread
+    def _score_query(self, query_text: str, store_index) -> dict:
+        """Embed a query and find its best category and attributes (blocking)"""
+        # Generate (or look up) the embedding for the query
+        query_embedding = self._encode([query_text])[0]
+        query_embedding = query_embedding / max(float(np.linalg.norm(query_embedding)), 1e-12)
         
-        result = {
+        # Cosine similarity via the category index (exact or approximate)
+        best_category, best_score = self.category_index.search(query_embedding, k=1)[0]
+        
+        # A store's own categories compete with the global ones
+        if store_index is not None and store_index.category_index is not None:
+            store_category, store_score = store_index.category_index.search(query_embedding, k=1)[0]
+            if store_score > best_score:
+                best_category, best_score = store_category, store_score
+        
+        threshold_met = bool(best_score > 0.2)  # Configurable threshold
+        return {
             "category": best_category,
             "score": float(best_score),
-            "threshold_met":  bool(best_score > 0.2)  # Configurable threshold
+            "threshold_met": threshold_met,
+            # Reuses the query embedding; no extra encode
+            "attributes": self._match_attributes(best_category, query_embedding, store_index) if threshold_met else {}
         }
+
+class StoreTaxonomyIndex:
+    """Embedding index and validation data for one store's taxonomy extension"""
+    
+    def __init__(self, store_id: str, extension: TaxonomyExtension, category_index, attribute_index):
+        self.store_id = store_id
+        self.version = extension.version
+        self.category_index = category_index
+        self.attribute_index = attribute_index
+        self.category_names = {category.name.lower(): category.id for category in extension.categories}
         
-        # Cache result with short TTL
-        await set_cache_json(cache_key, result, {"EX": CACHE_TTL["TAXONOMY_SEARCH"]})
-        
-        return result
+        # Attribute values the extension adds, per category id
+        self.valid_attributes = {}
+        extended = {category.id: category.attributes for category in extension.categories}
+        extended.update(extension.attributes)
+        for category_id, attributes in extended.items():
+            self.valid_attributes[category_id] = {attr.name: set(attr.values) for attr in attributes}
 
 # Singleton instance
 _taxonomy_service = None
@@ -186,4 +641,67 @@ async def get_taxonomy_service(db=None):
     if _taxonomy_service is None:
         _taxonomy_service = TaxonomyService(db)
         await _taxonomy_service.initialize()
-    return _taxonomy_service
\ No newline at end of file
+    return _taxonomy_service
+
+# Read-only state shared with forked workers (see gunicorn.conf.py)
+_shared_model = None
+_shared_matrices = {}
+
+def get_embedding_model():
+    """Return the process-wide embedding model, loading it on first use"""
+    global _shared_model
+    if _shared_model is None:
+        # Specify a writable cache directory inside the container
+        _shared_model = SentenceTransformer(
+            settings.EMBEDDING_MODEL_NAME, cache_folder=settings.MODEL_CACHE_DIR
+        )
+    return _shared_model
+
+def taxonomy_fingerprint(taxonomy: Taxonomy) -> str:
+    """Hash of the model and every category's embedded text"""
+    digest = hashlib.sha256(settings.EMBEDDING_MODEL_NAME.encode("utf-8"))
+    for category in taxonomy.categories:
+        digest.update(f"\0{category.id}\0{TaxonomyService._category_text(category)}".encode("utf-8"))
+    return digest.hexdigest()
+
+def get_shared_category_matrix(taxonomy: Taxonomy):
+    """Return (category_ids, matrix) preloaded for this taxonomy, if any"""
+    return _shared_matrices.get(taxonomy_fingerprint(taxonomy))
+
+def share_category_matrix(taxonomy: Taxonomy, category_ids: List[str], matrix: np.ndarray):
+    """
+    Write a category matrix to SHARED_MEMORY_DIR and memory-map it read-only,
+    so forked workers read the same physical pages instead of holding copies.
+    """
+    fingerprint = taxonomy_fingerprint(taxonomy)
+    os.makedirs(settings.SHARED_MEMORY_DIR, exist_ok=True)
+    path = os.path.join(settings.SHARED_MEMORY_DIR, f"categories-{fingerprint[:16]}.npy")
+    np.save(path, np.ascontiguousarray(matrix, dtype=np.float32))
+    _shared_matrices[fingerprint] = (list(category_ids), np.load(path, mmap_mode="r"))
+    return path
+
+def preload_shared_state():
+    """
+    Load the embedding model and the file taxonomy's category matrix in the
+    master process before workers fork. Workers then share the model weights
+    copy-on-write and the matrix through the memory map.
+    """
+    service = TaxonomyService()
+    service.taxonomy = service._load_from_file()
+    service.embedding_model = get_embedding_model()
+    service.embedding_store = open_embedding_store(
+        settings.EMBEDDING_STORE_PATH, settings.EMBEDDING_MODEL_NAME
+    )
+    
+    texts = [service._category_text(category) for category in service.taxonomy.categories]
+    service.category_embeddings = dict(
+        zip([category.id for category in service.taxonomy.categories], service._encode(texts))
+    )
+    service._build_category_matrix()
+    
+    # SQLite connections must not cross a fork; workers reopen the store
+    if service.embedding_store:
+        service.embedding_store.close()
+    
+    path = share_category_matrix(service.taxonomy, service.category_ids, service.category_matrix)
+    logger.info(f"Preloaded model and {len(service.category_ids)} category embeddings into {path}")
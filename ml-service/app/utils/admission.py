@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_WAIT, ADMISSION_REJECTIONS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Request priorities; lower is admitted first
+CHEAP = 0
+MODEL_BOUND = 1
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted"""
+    def __init__(self, name: str, reason: str, retry_after: float):
+        super().__init__(f"{name} is overloaded ({reason})")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        # A full queue is the client's cue to back off; a missed deadline is a server-side stall
+        return 503 if self.reason == "timeout" else 429
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded, prioritized wait queue for one endpoint.
+
+    Up to `max_concurrency` requests run at once; up to `max_queue` more wait,
+    cheapest priority first, for at most `queue_timeout` seconds. Anything
+    beyond that is rejected immediately so latency stays bounded under bursts
+    instead of collapsing for every caller. When the queue is full, a cheap
+    request displaces the newest waiting model-bound one.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.rejections = {"queue_full": 0, "shed": 0, "timeout": 0}
+        self._waiters = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+        self._service_time = 0.1  # EWMA of seconds per admitted request, for Retry-After
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Estimated seconds until the current backlog drains"""
+        backlog = (self.queue_depth + 1) / max(self.max_concurrency, 1)
+        return max(1.0, math.ceil(self._service_time * backlog))
+
+    def snapshot(self) -> dict:
+        """Current state for health reporting"""
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queue_depth,
+            "max_queue": self.max_queue,
+            "rejections": dict(self.rejections),
+        }
+
+    @asynccontextmanager
+    async def admit(self, priority: int = MODEL_BOUND):
+        """Hold an admission slot for the duration of the block"""
+        await self._acquire(priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - start)
+            self._release()
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejections[reason] += 1
+        ADMISSION_REJECTIONS.labels(endpoint=self.name, reason=reason).inc()
+        return AdmissionRejected(self.name, reason, self.retry_after())
+
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.labels(endpoint=self.name).set(self.active)
+        ADMISSION_QUEUE_DEPTH.labels(endpoint=self.name).set(self.queue_depth)
+
+    def _discard(self, entry):
+        """Remove a waiter that gave up"""
+        try:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        except ValueError:
+            pass
+
+    async def _acquire(self, priority: int):
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self._update_gauges()
+            return
+
+        if self.queue_depth >= self.max_queue:
+            # Newest waiter of the most expensive class
+            victim = max(self._waiters) if self._waiters else None
+            if victim is None or victim[0] <= priority:
+                raise self._reject("queue_full")
+            self._discard(victim)
+            victim[2].set_exception(self._reject("shed"))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, entry)
+        self._update_gauges()
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                return  # Slot handed over as the deadline passed
+            self._discard(entry)
+            self._update_gauges()
+            raise self._reject("timeout")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Pass the slot we were just given to the next waiter
+                self._release()
+            else:
+                self._discard(entry)
+                self._update_gauges()
+            raise
+        finally:
+            ADMISSION_WAIT.labels(endpoint=self.name).observe(time.monotonic() - start)
+
+    def _release(self):
+        """Hand the slot to the best waiting request, or free it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+# Model-bound endpoints; limits are per worker process
+search_admission = AdmissionController(
+    "taxonomy_search",
+    max_concurrency=settings.SEARCH_MAX_CONCURRENCY,
+    max_queue=settings.SEARCH_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT
+)
+processing_admission = AdmissionController(
+    "data_process",
+    max_concurrency=settings.PROCESS_MAX_CONCURRENCY,
+    max_queue=settings.PROCESS_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT
+)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Circuit breaker around a remote dependency.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    `allow_request` fails fast without touching the dependency. While open, a
+    background monitor probes the dependency and closes the breaker once the
+    probe succeeds. After `reset_timeout` a single trial call is also let
+    through (half-open) so the breaker recovers even without a monitor.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self.last_checked = None
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_available(self) -> bool:
+        """Whether the dependency is currently considered reachable"""
+        return self.state == CLOSED
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will let a trial call through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow_request(self) -> bool:
+        """Check whether a call may be attempted right now"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self.retry_after() == 0.0:
+            # Let a single trial call through
+            self.state = HALF_OPEN
+            return True
+        return False
+
+    def record_success(self):
+        """Record a successful call"""
+        if self.state != CLOSED:
+            logger.info(f"{self.name} circuit closed")
+        self.state = CLOSED
+        self.failure_count = 0
+        self.last_checked = time.time()
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker when the threshold is reached"""
+        self.failure_count += 1
+        self.last_checked = time.time()
+        if self.state == HALF_OPEN or self.failure_count >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"{self.name} circuit opened after {self.failure_count} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Cached breaker state for health reporting"""
+        return {
+            "state": self.state,
+            "failures": self.failure_count,
+            "retry_after": round(self.retry_after(), 1),
+            "last_checked": self.last_checked,
+        }
+
+    def start_monitor(self, probe: Callable[[], Awaitable[bool]], interval: float):
+        """Start a background task that probes the dependency every `interval` seconds"""
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._monitor(probe, interval))
+
+    async def stop_monitor(self):
+        """Stop the background probe task"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+
+    async def _monitor(self, probe: Callable[[], Awaitable[bool]], interval: float):
+        """Probe loop; a successful probe closes an open breaker"""
+        while True:
+            try:
+                healthy = await probe()
+            except Exception as e:
+                logger.debug(f"{self.name} probe error: {e}")
+                healthy = False
+
+            if healthy:
+                self.record_success()
+            else:
+                self.record_failure()
+            await asyncio.sleep(interval)
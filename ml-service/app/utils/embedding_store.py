@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+import numpy as np
+from app.core.config import settings
+from app.utils.serialization import encode_vector, decode_vector
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """
+    Persistent, disk-backed store of text embeddings.
+
+    Vectors are kept as float32 blobs in SQLite, keyed by a hash of the model
+    version and the text, so they survive restarts and taxonomy or threshold
+    changes. WAL mode lets every worker on a node share the same file.
+
+    Writes and last-used stamps are buffered and flushed by a background
+    thread, which also bounds the file: rows of other model versions are
+    purged and the least recently used rows beyond `max_rows` are evicted.
+    """
+
+    def __init__(self, path: str, model_version: str, max_rows: int = None,
+                 flush_interval: float = None, prune_interval: float = None):
+        self.path = path
+        self.model_version = model_version
+        self.max_rows = max_rows if max_rows is not None else settings.EMBEDDING_STORE_MAX_ROWS
+        self.flush_interval = flush_interval if flush_interval is not None else settings.EMBEDDING_STORE_FLUSH_INTERVAL
+        self.prune_interval = prune_interval if prune_interval is not None else settings.EMBEDDING_STORE_PRUNE_INTERVAL
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> (dim, blob) awaiting flush
+        self._touched = set()  # keys read since the last flush
+        self._stopped = threading.Event()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL, "
+            "last_used INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "last_used" not in columns:
+            # Stores created before eviction existed
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+        self._writer = threading.Thread(target=self._run_writer, name="embedding-store-writer", daemon=True)
+        self._writer.start()
+
+    def _key(self, text: str) -> str:
+        """Hash of model version and text"""
+        return hashlib.sha256(f"{self.model_version}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Return stored vectors for the given texts; missing texts are omitted"""
+        keys = {self._key(text): text for text in texts}
+        found = {}
+
+        with self._lock:
+            key_list = []
+            for key, text in keys.items():
+                if key in self._pending:
+                    found[text] = decode_vector(self._pending[key][1])
+                else:
+                    key_list.append(key)
+
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[keys[key]] = decode_vector(blob)
+                    self._touched.add(key)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        """Buffer vectors keyed by their text; they are written by the next flush"""
+        with self._lock:
+            for text, vector in vectors.items():
+                blob = encode_vector(vector)
+                self._pending[self._key(text)] = (len(blob) // 4, blob)
+
+    def flush(self):
+        """Write buffered vectors and last-used stamps in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched - pending.keys(), set()
+            if not pending and not touched:
+                return
+            now = int(time.time() * 1000)  # milliseconds, so LRU order survives bursts
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(key, self.model_version, dim, blob, now) for key, (dim, blob) in pending.items()]
+            )
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in touched]
+            )
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """Purge other model versions and evict least recently used rows beyond max_rows"""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM embeddings WHERE model != ?", (self.model_version,)
+            ).rowcount
+            excess = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_rows
+            if excess > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)", (excess,)
+                ).rowcount
+            self._conn.commit()
+        if removed:
+            logger.info(f"Pruned {removed} embeddings from {self.path}")
+        return removed
+
+    def _run_writer(self):
+        """Background loop flushing buffered writes and pruning the store"""
+        next_prune = time.monotonic() + self.prune_interval
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.monotonic() >= next_prune:
+                    self.prune()
+                    next_prune = time.monotonic() + self.prune_interval
+            except Exception as e:
+                logger.error(f"Embedding store maintenance failed: {str(e)}")
+
+    def close(self):
+        """Flush pending writes and close the underlying database connection"""
+        self._stopped.set()
+        self._writer.join(timeout=5.0)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush embeddings on close: {str(e)}")
+        with self._lock:
+            self._conn.close()
+
+def open_embedding_store(path: str, model_version: str):
+    """Open the embedding store, or return None if the path is unusable"""
+    try:
+        return EmbeddingStore(path, model_version)
+    except Exception as e:
+        logger.error(f"Embedding store unavailable at {path}: {str(e)}")
+        return None
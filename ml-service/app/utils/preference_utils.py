@@ -1,11 +1,19 @@
+import hashlib
 import logging
-from typing import Any
+from datetime import datetime
+from typing import Any, List, Optional
+from app.core.config import settings
+from app.db.mongodb import mongo_breaker
+from app.utils.serialization import dumps
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 async def mark_processing_failed(db, email: str):
     """Mark userData processing as failed when errors occur"""
+    if not mongo_breaker.is_available:
+        logger.warning(f"Skipping failed-status update for {email}: database unavailable")
+        return
     try:
         await db.userData.update_one(
             {"email": email, "processedStatus": "pending"},
@@ -13,4 +21,75 @@ async def mark_processing_failed(db, email: str):
         )
         logger.info(f"Marked processing failed for {email}")
     except Exception as e:
-        logger.error(f"Failed to update status to failed: {str(e)}")
\ No newline at end of file
+        logger.error(f"Failed to update status to failed: {str(e)}")
+
+
+def decay_factor(last_updated: Optional[datetime], now: datetime) -> float:
+    """Multiplier for a value last rebased at `last_updated`, evaluated at `now`"""
+    half_life_days = settings.PREFERENCE_DECAY_HALF_LIFE_DAYS
+    if half_life_days <= 0 or not isinstance(last_updated, datetime):
+        return 1.0
+    
+    age_days = (now - last_updated).total_seconds() / 86400
+    if age_days <= 0:
+        return 1.0
+    return 0.5 ** (age_days / half_life_days)
+
+def apply_decay(preference: dict, now: datetime, default_updated: Optional[datetime] = None) -> dict:
+    """
+    Lazily decay a stored preference to `now`.
+    
+    Stored scores are only rebased when the user document is written, so the
+    decay is evaluated here at read time from the per-category `lastUpdated`
+    timestamp (falling back to `default_updated` for older documents).
+    """
+    factor = decay_factor(preference.get("lastUpdated", default_updated), now)
+    decayed = dict(preference)
+    decayed["lastUpdated"] = now
+    if factor == 1.0:
+        return decayed
+    
+    decayed["score"] = preference["score"] * factor
+    if preference.get("attributes"):
+        decayed["attributes"] = {
+            attr_name: {value: score * factor for value, score in values.items()}
+            for attr_name, values in preference["attributes"].items()
+        }
+    return decayed
+
+def prune_preferences(preferences: List[dict]) -> List[dict]:
+    """
+    Bound a preference list: drop scores below MIN_PREFERENCE_SCORE, keep the
+    top MAX_ATTRIBUTE_VALUES values per attribute and the top
+    MAX_PREFERENCE_CATEGORIES categories by score.
+    """
+    min_score = settings.MIN_PREFERENCE_SCORE
+    pruned = []
+    
+    for pref in preferences:
+        if pref["score"] < min_score:
+            continue
+        
+        if pref.get("attributes"):
+            attributes = {}
+            for attr_name, values in pref["attributes"].items():
+                kept = sorted(
+                    ((value, score) for value, score in values.items() if score >= min_score),
+                    key=lambda item: item[1],
+                    reverse=True
+                )[:settings.MAX_ATTRIBUTE_VALUES]
+                if kept:
+                    attributes[attr_name] = dict(kept)
+            pref = {**pref, "attributes": attributes}
+        pruned.append(pref)
+    
+    pruned.sort(key=lambda pref: pref["score"], reverse=True)
+    return pruned[:settings.MAX_PREFERENCE_CATEGORIES]
+
+def payload_hash(data) -> str:
+    """Content hash of a UserDataEntry, stable across key order and retries"""
+    canonical = dumps(
+        {"email": data.email, "data_type": data.data_type, "entries": data.entries},
+        sort_keys=True
+    )
+    return hashlib.sha256(canonical).hexdigest()
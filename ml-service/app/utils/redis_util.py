@@ -1,8 +1,11 @@
 import redis
 import os
-import json
+import asyncio
 import logging
 from app.core.config import settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.core.metrics import timed, REDIS_LATENCY, REDIS_CACHE_REQUESTS
+from app.utils.serialization import dumps_str, loads
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -35,7 +38,10 @@ CACHE_KEYS = {
     "STORE_PREFERENCES": "prefs:",
     "AI_REQUEST": "ai_request:",
     "TAXONOMY_SEARCH": "taxonomy:search:",
+    "TAXONOMY_SEARCH_INDEX": "taxonomy:search-index:",
     "TAXONOMY_EMBEDDINGS": "taxonomy:embeddings:",
+    "PROCESSED_PAYLOAD": "processed:",
+    "PROCESSING_CLAIM": "processing:",
 }
 
 # Define standard TTL values matching Node.js values
@@ -48,39 +54,59 @@ CACHE_TTL = {
     "AI_REQUEST": 60,  # AI service requests - 1 minute
     "TAXONOMY_SEARCH": CACHE_DURATIONS["SHORT"],  # Now using CACHE_DURATIONS directly
     "TAXONOMY_EMBEDDINGS": CACHE_DURATIONS["LONG"],
+    "PROCESSED_PAYLOAD": CACHE_DURATIONS["LONG"],  # Window for duplicate uploads
 }
 
+# Circuit breaker: while open, cache reads miss and writes are skipped
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_TIMEOUT
+)
+
 async def connect_redis():
     """
     Connect to Redis server (should be called during application startup)
     """
     try:
         redis_client.ping()
+        redis_breaker.record_success()
         logger.info("Connected to Redis")
         return True
     except Exception as e:
+        redis_breaker.record_failure()
         logger.error(f"Redis connection error: {e}")
         return False
 
 async def ensure_connection():
     """
-    Ensures Redis is connected before operations
+    Ensures Redis is usable before operations, without a round trip.
+    Returns False (degraded mode) while the circuit breaker is open.
     """
-    return await connect_redis()
+    return redis_breaker.allow_request()
 
 async def get_cache(key: str):
     """
     Get value from cache
     """
     prefixed_key = ENVIRONMENT_PREFIX + key
+    if not await ensure_connection():
+        REDIS_CACHE_REQUESTS.labels(result="skipped").inc()
+        return None
     try:
-        value = redis_client.get(prefixed_key)
+        with timed(REDIS_LATENCY, operation="get"):
+            value = redis_client.get(prefixed_key)
+        redis_breaker.record_success()
         if value:
+            REDIS_CACHE_REQUESTS.labels(result="hit").inc()
             logger.debug(f"Cache hit: {prefixed_key}")
             return value
+        REDIS_CACHE_REQUESTS.labels(result="miss").inc()
         logger.debug(f"Cache miss: {prefixed_key}")
         return None
     except Exception as e:
+        REDIS_CACHE_REQUESTS.labels(result="error").inc()
+        redis_breaker.record_failure()
         logger.error(f"Error getting cache {prefixed_key}: {e}")
         return None
 
@@ -99,14 +125,17 @@ async def set_cache(key: str, value: str, options: dict = None):
         # Handle expiration time
         ex = options.get("EX", None)
         
-        if ex:
-            redis_client.set(prefixed_key, value, ex=ex)
-        else:
-            redis_client.set(prefixed_key, value)
+        with timed(REDIS_LATENCY, operation="set"):
+            if ex:
+                redis_client.set(prefixed_key, value, ex=ex)
+            else:
+                redis_client.set(prefixed_key, value)
             
+        redis_breaker.record_success()
         logger.debug(f"Cache set: {prefixed_key}")
         return True
     except Exception as e:
+        redis_breaker.record_failure()
         logger.error(f"Error setting cache {prefixed_key}: {e}")
         return False
 
@@ -115,62 +144,120 @@ async def invalidate_cache(key: str) -> bool:
     Invalidate a cache entry by setting a short expiration (matches Node.js approach)
     """
     prefixed_key = ENVIRONMENT_PREFIX + key
-    try:
-        if not await ensure_connection():
-            return False
-            
-        # Match Node.js approach: set with empty value and short TTL
-        await set_cache(key, "", {"EX": CACHE_TTL["INVALIDATION"]})
+    # Match Node.js approach: set with empty value and short TTL
+    if await set_cache(key, "", {"EX": CACHE_TTL["INVALIDATION"]}):
         logger.info(f"Invalidated cache: {prefixed_key}")
         return True
+    return False
+
+async def claim_cache(key: str, ttl: int) -> bool:
+    """
+    Atomically create a marker key unless it exists (SET NX EX).
+    Returns True when claimed; fails open (True) while Redis is unavailable.
+    """
+    prefixed_key = ENVIRONMENT_PREFIX + key
+    if not await ensure_connection():
+        return True
+    try:
+        with timed(REDIS_LATENCY, operation="set"):
+            claimed = redis_client.set(prefixed_key, "1", nx=True, ex=ttl)
+        redis_breaker.record_success()
+        return bool(claimed)
     except Exception as e:
-        logger.error(f"Error invalidating cache {prefixed_key}: {e}")
+        redis_breaker.record_failure()
+        logger.error(f"Error claiming {prefixed_key}: {e}")
+        return True
+
+async def delete_cache(keys: list) -> bool:
+    """
+    Delete cache entries outright
+    """
+    if not keys or not await ensure_connection():
+        return False
+    try:
+        redis_client.delete(*[ENVIRONMENT_PREFIX + key for key in keys])
+        redis_breaker.record_success()
+        logger.debug(f"Deleted {len(keys)} cache entries")
+        return True
+    except Exception as e:
+        redis_breaker.record_failure()
+        logger.error(f"Error deleting cache entries: {e}")
+        return False
+
+async def add_to_set(key: str, member: str, ttl: int = None) -> bool:
+    """
+    Add a member to a cache set, refreshing its expiration
+    """
+    prefixed_key = ENVIRONMENT_PREFIX + key
+    if not await ensure_connection():
+        return False
+    try:
+        pipe = redis_client.pipeline()
+        pipe.sadd(prefixed_key, member)
+        if ttl:
+            pipe.expire(prefixed_key, ttl)
+        pipe.execute()
+        redis_breaker.record_success()
+        return True
+    except Exception as e:
+        redis_breaker.record_failure()
+        logger.error(f"Error adding to set {prefixed_key}: {e}")
         return False
 
+async def get_set_members(keys: list) -> dict:
+    """
+    Get the members of several cache sets in one round trip
+    """
+    if not keys or not await ensure_connection():
+        return {}
+    try:
+        pipe = redis_client.pipeline()
+        for key in keys:
+            pipe.smembers(ENVIRONMENT_PREFIX + key)
+        results = pipe.execute()
+        redis_breaker.record_success()
+        return dict(zip(keys, results))
+    except Exception as e:
+        redis_breaker.record_failure()
+        logger.error(f"Error getting set members: {e}")
+        return {}
+
 async def ping_redis() -> bool:
     """
     Check if Redis is connected and responding
     """
     try:
-        # Use a simple ping command to check connection
-        response = redis_client.ping()
+        # Run the blocking ping off the event loop
+        response = await asyncio.to_thread(redis_client.ping)
         return response == True
     except Exception as e:
         logger.error(f"Redis ping error: {str(e)}")
         return False
 
+def start_redis_monitor():
+    """Start background probing of Redis (called during application startup)"""
+    redis_breaker.start_monitor(ping_redis, settings.HEALTH_PROBE_INTERVAL)
+
+async def stop_redis_monitor():
+    """Stop background probing of Redis"""
+    await redis_breaker.stop_monitor()
+
 # New helper methods for JSON handling
 async def get_cache_json(key: str):
     """Get JSON value from cache"""
     value = await get_cache(key)
     if value:
         try:
-            return json.loads(value)
-        except json.JSONDecodeError as e:
+            return loads(value)
+        except ValueError as e:
             logger.error(f"Error decoding JSON from cache {key}: {e}")
     return None
 
 async def set_cache_json(key: str, value, options: dict = None):
     """Set JSON value in cache with options"""
     try:
-        # Convert numpy values to Python native types
-        json_value = json.dumps(value, default=numpy_to_python)
-        return await set_cache(key, json_value, options)
+        # numpy values are serialized natively by the codec
+        return await set_cache(key, dumps_str(value), options)
     except TypeError as e:
         logger.error(f"Error encoding object to JSON for cache {key}: {e}")
-        return False
-
-def numpy_to_python(obj):
-    """Convert numpy data types to Python native types for JSON serialization"""
-    import numpy as np
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, (np.generic)):
-        return obj.item()
-    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
\ No newline at end of file
+        return False
\ No newline at end of file
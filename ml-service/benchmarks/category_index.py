@@ -0,0 +1,95 @@
+"""
+Recall and latency of the category indexes by taxonomy size.
+
+Uses synthetic clustered unit vectors shaped like sentence embeddings, so it
+runs offline without the embedding model. Recall is top-1 agreement of the
+IVF index with exact search.
+
+Usage: python -m benchmarks.category_index [--sizes 100 1000 10000] [--queries 500] [--output results.json]
+"""
+import argparse
+import json
+import time
+import numpy as np
+from app.services.categoryIndex import ExactCategoryIndex, IVFCategoryIndex
+
+DIMENSION = 384
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def synthetic_taxonomy(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Categories scattered around topic centres, like sibling categories in a tree"""
+    topics = normalize(rng.standard_normal((max(1, size // 20), DIMENSION)))
+    members = topics[rng.integers(0, len(topics), size)]
+    return normalize(members + 0.6 * normalize(rng.standard_normal((size, DIMENSION)))).astype(np.float32)
+
+def synthetic_queries(matrix: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    """Queries near random categories"""
+    targets = matrix[rng.integers(0, len(matrix), count)]
+    return normalize(targets + 0.8 * normalize(rng.standard_normal((count, DIMENSION)))).astype(np.float32)
+
+def time_queries(index, queries: np.ndarray):
+    """Per-query latencies in milliseconds and the top-1 result of each"""
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(index.search(query, k=1)[0][0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), results
+
+def summarize(latencies: np.ndarray) -> dict:
+    return {
+        "mean_ms": round(float(latencies.mean()), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+def run(sizes, query_count: int, nprobe: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    report = []
+    for size in sizes:
+        matrix = synthetic_taxonomy(size, rng)
+        ids = [str(i) for i in range(size)]
+        queries = synthetic_queries(matrix, query_count, rng)
+
+        exact = ExactCategoryIndex(ids, matrix)
+        build_start = time.perf_counter()
+        ivf = IVFCategoryIndex(ids, matrix, nprobe=nprobe)
+        build_seconds = time.perf_counter() - build_start
+
+        exact_latency, exact_results = time_queries(exact, queries)
+        ivf_latency, ivf_results = time_queries(ivf, queries)
+        recall = float(np.mean([a == b for a, b in zip(exact_results, ivf_results)]))
+
+        row = {
+            "categories": size,
+            "exact": summarize(exact_latency),
+            "ivf": {
+                **summarize(ivf_latency),
+                "recall_at_1": round(recall, 4),
+                "n_lists": ivf.n_lists,
+                "nprobe": ivf.nprobe,
+                "build_seconds": round(build_seconds, 3),
+            },
+        }
+        report.append(row)
+        print(f"{size:>7} categories  exact p50 {row['exact']['p50_ms']:.3f}ms  "
+              f"ivf p50 {row['ivf']['p50_ms']:.3f}ms  recall@1 {recall:.3f}")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Category index recall/latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--nprobe", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.queries, args.nprobe)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+End-to-end load test of the FastAPI app with synthetic users.
+
+Drives /api/users/data/process and /api/taxonomy/search concurrently through
+the ASGI app in-process, against fakeredis, an in-memory MongoDB and the stub
+(or locally cached) embedding model. For each concurrency level it reports
+throughput and p50/p95/p99 latency per endpoint, plus process CPU and RSS, so
+the point where p99 degrades for one replica can be read off the table.
+
+Usage:
+    python -m benchmarks.loadtest [--concurrency 1 4 16 64] [--duration 20]
+                                  [--users 1000] [--search-ratio 0.7] [--model stub|real]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def rss_mb() -> float:
+    """Current resident set size"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+async def build_app(user_count: int, model: str):
+    """Wire the app to local stand-ins and seed synthetic users"""
+    from bson import ObjectId
+    from benchmarks.standins import InMemoryDatabase, install_fakeredis, install_embedding_model
+    from benchmarks.synthetic import SyntheticData, load_taxonomy
+    from app.db import mongodb
+    from app.main import app
+    from app.services.taxonomyService import get_taxonomy_service
+
+    install_fakeredis()
+    install_embedding_model(model)
+    db = InMemoryDatabase()
+    mongodb.db = db
+    mongodb.mongo_breaker.record_success()
+
+    data = SyntheticData(load_taxonomy(), seed=1)
+    users = []
+    for index in range(user_count):
+        user = {"_id": ObjectId(), **data.user(index)}
+        await db.users.insert_one(user)
+        users.append(user)
+
+    app.state.taxonomy = await get_taxonomy_service(db)
+    return app, users, data
+
+async def run_level(client, users, data, concurrency: int, duration: float, search_ratio: float, api_key: str):
+    """Run `concurrency` closed-loop clients for `duration` seconds"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.perf_counter() + duration
+    headers = {"X-API-Key": api_key}
+    rng = random.Random(concurrency)
+
+    async def client_loop():
+        while time.perf_counter() < deadline:
+            if rng.random() < search_ratio:
+                endpoint = "/api/taxonomy/search"
+                request = client.get(endpoint, params={"query": data.search_query()}, headers=headers)
+            else:
+                endpoint = "/api/users/data/process"
+                user = rng.choice(users)
+                data_type = rng.choice(["purchase", "search"])
+                entries = data.purchase_entries(3) if data_type == "purchase" else data.search_entries(5)
+                payload = {
+                    "email": user["email"],
+                    "data_type": data_type,
+                    "entries": entries,
+                    "metadata": {"userId": str(user["_id"])},
+                }
+                request = client.post(endpoint, json=payload, headers=headers)
+
+            start = time.perf_counter()
+            response = await request
+            latencies[endpoint].append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors[endpoint] += 1
+
+    cpu_start, wall_start = cpu_seconds(), time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+
+    endpoints = {}
+    for endpoint, values in latencies.items():
+        values = np.array(values)
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": errors[endpoint],
+            "rps": round(len(values) / wall, 1),
+            "p50_ms": round(float(np.percentile(values, 50)), 2),
+            "p95_ms": round(float(np.percentile(values, 95)), 2),
+            "p99_ms": round(float(np.percentile(values, 99)), 2),
+        }
+    return {
+        "concurrency": concurrency,
+        "seconds": round(wall, 2),
+        "total_rps": round(sum(len(v) for v in latencies.values()) / wall, 1),
+        "cpu_percent": round(cpu / wall * 100, 1),
+        "rss_mb": round(rss_mb(), 1),
+        "endpoints": endpoints,
+    }
+
+def print_level(level: dict):
+    print(f"\nconcurrency {level['concurrency']}: {level['total_rps']} req/s, "
+          f"cpu {level['cpu_percent']}%, rss {level['rss_mb']}MB")
+    for endpoint, stats in sorted(level["endpoints"].items()):
+        print(f"  {endpoint:<28} {stats['rps']:>8} req/s  p50 {stats['p50_ms']:>8}ms  "
+              f"p95 {stats['p95_ms']:>8}ms  p99 {stats['p99_ms']:>8}ms  errors {stats['errors']}")
+
+async def main_async(args):
+    import httpx
+    from app.core.config import settings
+
+    app, users, data = await build_app(args.users, args.model)
+    transport = httpx.ASGITransport(app=app)
+    levels = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+        for concurrency in args.concurrency:
+            level = await run_level(
+                client, users, data, concurrency, args.duration, args.search_ratio, settings.SECRET_KEY
+            )
+            print_level(level)
+            levels.append(level)
+    return levels
+
+def main():
+    parser = argparse.ArgumentParser(description="ml-service load test")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per concurrency level")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--search-ratio", type=float, default=0.7,
+                        help="share of requests sent to /taxonomy/search")
+    parser.add_argument("--model", choices=["stub", "real"], default="stub")
+    parser.add_argument("--output", default=str(RESULTS_DIR))
+    args = parser.parse_args()
+
+    # Keep the persistent embedding store and background tasks out of the way
+    os.environ.setdefault(
+        "EMBEDDING_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="tapiro-load-"), "embeddings.sqlite3")
+    )
+    from app.core.config import settings
+    settings.EMBEDDING_STORE_PATH = os.environ["EMBEDDING_STORE_PATH"]
+    settings.TAXONOMY_WATCH_INTERVAL = 0
+
+    levels = asyncio.run(main_async(args))
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump({"args": vars(args), "levels": levels}, f, indent=2)
+    print(f"\nWrote {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Micro-benchmarks for ml-service hot paths.
+
+Runs offline against fakeredis, an in-memory MongoDB and a stub (or locally
+cached) embedding model, with payloads generated from taxonomy.yaml. Results
+are written as JSON so runs can be compared between commits.
+
+Usage:
+    python -m benchmarks.run [--scale 1] [--repeat 200] [--model stub|real]
+                             [--output benchmarks/results] [--compare previous.json]
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+async def measure(name: str, fn, repeat: int, setup=None, warmup: int = 5) -> dict:
+    """Time `fn(*setup())` over `repeat` runs; setup is excluded from timings"""
+    for _ in range(warmup):
+        await fn(*(setup() if setup else ()))
+
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        await fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    result = {
+        "name": name,
+        "runs": repeat,
+        "mean_ms": round(float(timings.mean()), 4),
+        "p50_ms": round(float(np.percentile(timings, 50)), 4),
+        "p95_ms": round(float(np.percentile(timings, 95)), 4),
+        "min_ms": round(float(timings.min()), 4),
+        "ops_per_sec": round(1000 / float(timings.mean()), 1),
+    }
+    print(f"{name:<40} mean {result['mean_ms']:>9.3f}ms  p95 {result['p95_ms']:>9.3f}ms")
+    return result
+
+async def run_benchmarks(scale: int, repeat: int, model: str) -> list:
+    from benchmarks.standins import InMemoryDatabase, install_fakeredis, install_embedding_model
+    from benchmarks.synthetic import SyntheticData
+    from app.models.preferences import UserPreference
+    from app.services.taxonomyService import TaxonomyService
+    from app.services.preferenceProcessor import (
+        process_purchase_data, process_search_data, normalize_categories
+    )
+    from app.utils.redis_util import get_cache_json, set_cache_json
+
+    install_fakeredis()
+    install_embedding_model(model)
+    db = InMemoryDatabase()
+    taxonomy = TaxonomyService(db)
+    await taxonomy.initialize()
+
+    data = SyntheticData(taxonomy.taxonomy, scale=scale)
+    purchases = data.purchase_entries()
+    searches = data.search_entries()
+    stored_preferences = data.preferences()
+    valid_preferences = [
+        UserPreference(category=category.id, score=0.5, attributes={
+            attr.name: {value: 0.5 for value in attr.values[:3]} for attr in category.attributes
+        })
+        for category in taxonomy.taxonomy.categories[:10 * scale]
+    ]
+    cache_payload = [
+        {key: value for key, value in pref.items() if key != "lastUpdated"} for pref in stored_preferences
+    ]
+    await set_cache_json("bench:preferences", cache_payload)
+
+    counter = iter(range(10 ** 9))
+    fresh_query = lambda: (f"{data.search_query()} {next(counter)}",)
+    warm_query = data.search_query()
+    await taxonomy.match_category(warm_query)
+
+    def preference_dict():
+        return ({pref["category"]: pref for pref in copy.deepcopy(stored_preferences)},)
+
+    return [
+        await measure("match_category (uncached)", taxonomy.match_category, repeat, fresh_query),
+        await measure("match_category (cached)", taxonomy.match_category, repeat, lambda: (warm_query,)),
+        await measure(
+            f"process_purchase_data ({len(purchases)} entries)", process_purchase_data, repeat,
+            lambda: (purchases, *preference_dict(), taxonomy)
+        ),
+        await measure(
+            f"process_search_data ({len(searches)} entries)", process_search_data, repeat,
+            lambda: (searches, *preference_dict(), taxonomy)
+        ),
+        await measure(
+            f"normalize_categories ({len(stored_preferences)} prefs)", normalize_categories, repeat,
+            lambda: (copy.deepcopy(stored_preferences), taxonomy)
+        ),
+        await measure(
+            f"validate_preferences ({len(valid_preferences)} prefs)",
+            lambda prefs: _as_coroutine(taxonomy.validate_preferences, prefs), repeat,
+            lambda: (valid_preferences,)
+        ),
+        await measure("set_cache_json (preferences)", set_cache_json, repeat,
+                      lambda: ("bench:preferences", cache_payload)),
+        await measure("get_cache_json (preferences)", get_cache_json, repeat, lambda: ("bench:preferences",)),
+    ]
+
+async def _as_coroutine(fn, *args):
+    return fn(*args)
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+def compare(results: list, previous_path: str):
+    """Print the change in mean latency against a previous results file"""
+    with open(previous_path) as f:
+        previous = {row["name"]: row for row in json.load(f)["results"]}
+    print(f"\nCompared with {previous_path}:")
+    for row in results:
+        before = previous.get(row["name"])
+        if before:
+            change = (row["mean_ms"] - before["mean_ms"]) / before["mean_ms"] * 100
+            print(f"{row['name']:<40} {before['mean_ms']:>9.3f}ms -> {row['mean_ms']:>9.3f}ms ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="ml-service micro-benchmarks")
+    parser.add_argument("--scale", type=int, default=1, help="multiplier for payload sizes")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--model", choices=["stub", "real"], default="stub")
+    parser.add_argument("--output", default=str(RESULTS_DIR))
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    # Keep the persistent embedding store out of the way of real deployments
+    store_dir = tempfile.mkdtemp(prefix="tapiro-bench-")
+    os.environ.setdefault("EMBEDDING_STORE_PATH", os.path.join(store_dir, "embeddings.sqlite3"))
+    from app.core.config import settings
+    settings.EMBEDDING_STORE_PATH = os.environ["EMBEDDING_STORE_PATH"]
+    settings.TAXONOMY_WATCH_INTERVAL = 0
+
+    results = asyncio.run(run_benchmarks(args.scale, args.repeat, args.model))
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "model": args.model,
+        "results": results,
+    }
+
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Local stand-ins so benchmarks run offline: fakeredis in place of Redis, an
+in-memory MongoDB, and a deterministic stub embedding model.
+"""
+import hashlib
+import numpy as np
+
+DIMENSION = 384
+
+class StubEmbeddingModel:
+    """Deterministic bag-of-words embeddings with the real model's shape"""
+
+    def __init__(self, dimension: int = DIMENSION):
+        self.dimension = dimension
+        self._words = {}
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            seed = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+            self._words[word] = vector
+        return vector
+
+    def encode(self, sentences, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(":", " ").split():
+                vectors[row] += self._word_vector(word)
+        return vectors[0] if single else vectors
+
+class InMemoryUpdateResult:
+    def __init__(self, matched: int, modified: int):
+        self.matched_count = matched
+        self.modified_count = modified
+
+class InMemoryCollection:
+    """The subset of the Motor collection API the ml-service uses, with equality filters"""
+
+    def __init__(self):
+        self.documents = []
+
+    @staticmethod
+    def _matches(document: dict, query: dict) -> bool:
+        return all(document.get(key) == value for key, value in query.items())
+
+    async def find_one(self, query: dict, projection=None):
+        for document in self.documents:
+            if self._matches(document, query):
+                return document
+        return None
+
+    async def insert_one(self, document: dict):
+        self.documents.append(document)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        for document in self.documents:
+            if self._matches(document, query):
+                document.update(update.get("$set", {}))
+                return InMemoryUpdateResult(1, 1)
+        if upsert:
+            self.documents.append({**query, **update.get("$set", {})})
+        return InMemoryUpdateResult(0, 0)
+
+class InMemoryDatabase:
+    """Attribute access creates collections on demand, like Motor"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, InMemoryCollection())
+
+    async def command(self, name: str):
+        return {"ok": 1}
+
+def install_fakeredis():
+    """Point redis_util at an in-process fakeredis server"""
+    import fakeredis
+    from app.utils import redis_util
+
+    redis_util.redis_client = fakeredis.FakeRedis(decode_responses=True)
+    redis_util.redis_breaker.record_success()
+    return redis_util.redis_client
+
+def install_embedding_model(model: str = "stub"):
+    """Use the stub model, or the locally cached real model when model == 'real'"""
+    from app.services import taxonomyService
+
+    if model == "stub":
+        taxonomyService._shared_model = StubEmbeddingModel()
+    return taxonomyService.get_embedding_model()
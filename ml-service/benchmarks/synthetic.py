@@ -0,0 +1,100 @@
+"""Synthetic users, purchases and searches drawn from taxonomy.yaml"""
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+import yaml
+from app.models.taxonomy import Taxonomy
+
+TAXONOMY_PATH = Path(__file__).parent.parent / "app" / "data" / "taxonomy.yaml"
+
+SEARCH_TEMPLATES = [
+    "{value} {name}",
+    "best {name}",
+    "{name} {value} deals",
+    "cheap {value} {name}",
+    "{name}",
+]
+
+def load_taxonomy() -> Taxonomy:
+    with open(TAXONOMY_PATH) as f:
+        return Taxonomy(**yaml.safe_load(f))
+
+class SyntheticData:
+    """Deterministic payload generator; `scale` multiplies entries per payload"""
+
+    def __init__(self, taxonomy: Taxonomy, scale: int = 1, seed: int = 0):
+        self.taxonomy = taxonomy
+        self.scale = scale
+        self.random = random.Random(seed)
+
+    def _category(self):
+        return self.random.choice(self.taxonomy.categories)
+
+    def purchase_item(self) -> dict:
+        category = self._category()
+        attributes = {
+            attr.name: self.random.choice(attr.values)
+            for attr in category.attributes
+            if self.random.random() < 0.7
+        }
+        return {
+            "name": f"{attributes.get('brand', '')} {category.name}".strip(),
+            "category": category.id,
+            "quantity": self.random.randint(1, 3),
+            "attributes": attributes,
+        }
+
+    def purchase_entries(self, count: int = None) -> List[dict]:
+        count = count or 10 * self.scale
+        now = datetime.now()
+        return [
+            {
+                "timestamp": (now - timedelta(days=self.random.randint(0, 60))).isoformat(),
+                "items": [self.purchase_item() for _ in range(self.random.randint(1, 4))],
+            }
+            for _ in range(count)
+        ]
+
+    def search_query(self) -> str:
+        category = self._category()
+        values = [value for attr in category.attributes for value in attr.values] or [""]
+        template = self.random.choice(SEARCH_TEMPLATES)
+        return template.format(name=category.name.lower(), value=self.random.choice(values)).strip()
+
+    def search_entries(self, count: int = None) -> List[dict]:
+        count = count or 20 * self.scale
+        entries = []
+        for _ in range(count):
+            entry = {"query": self.search_query(), "timestamp": datetime.now().isoformat()}
+            # Some stores send the category they already know
+            if self.random.random() < 0.2:
+                entry["category"] = self._category().id
+            entries.append(entry)
+        return entries
+
+    def preferences(self, count: int = None) -> List[dict]:
+        """A stored preference list, with attribute distributions"""
+        categories = self.random.sample(
+            self.taxonomy.categories, min(count or 10 * self.scale, len(self.taxonomy.categories))
+        )
+        return [
+            {
+                "category": category.id,
+                "score": round(self.random.random(), 4),
+                "attributes": {
+                    attr.name: {value: round(self.random.random(), 4) for value in attr.values[:5]}
+                    for attr in category.attributes
+                },
+                "lastUpdated": datetime.now() - timedelta(days=self.random.randint(0, 120)),
+            }
+            for category in categories
+        ]
+
+    def user(self, index: int) -> dict:
+        return {
+            "email": f"user{index}@example.com",
+            "auth0Id": f"auth0|bench{index}",
+            "preferences": self.preferences(),
+            "updatedAt": datetime.now() - timedelta(days=7),
+        }
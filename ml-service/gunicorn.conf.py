@@ -0,0 +1,46 @@
+"""
+Production serving configuration.
+
+The master process preloads the embedding model and the taxonomy's category
+matrix, then forks uvicorn workers that share those read-only pages
+copy-on-write (the matrix through a memory map in SHARED_MEMORY_DIR).
+
+Run with: gunicorn -c gunicorn.conf.py app.main:app
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+def on_starting(server):
+    """Load shared read-only state once, before any worker forks"""
+    # Start each run with an empty Prometheus multiprocess directory
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+    from app.services.taxonomyService import preload_shared_state
+    preload_shared_state()
+
+def post_fork(server, worker):
+    """Per-worker setup: cap torch threads so workers do not oversubscribe cores"""
+    import torch
+    from app.core.config import settings
+    from app.core.serving import mark_process_start
+
+    mark_process_start()
+    torch.set_num_threads(settings.TORCH_THREADS_PER_WORKER)
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the aggregated metrics"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
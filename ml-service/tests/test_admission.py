@@ -0,0 +1,88 @@
+"""Admission control sheds excess load with fast 429/503 responses"""
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.api.endpoints import taxonomy as taxonomy_endpoints
+from app.services.taxonomyService import get_taxonomy_service
+from app.utils.admission import AdmissionController, AdmissionRejected, CHEAP, MODEL_BOUND
+
+class SlowTaxonomy:
+    """Taxonomy service stand-in whose searches always miss the cache and take a while"""
+
+    async def cached_match(self, query_text, store_id=None):
+        return None
+
+    async def compute_match(self, query_text, store_id=None):
+        await asyncio.sleep(0.2)
+        return {"category": "100", "score": 0.9, "threshold_met": True, "attributes": {}}
+
+async def hold(controller, seconds, priority=MODEL_BOUND):
+    async with controller.admit(priority):
+        await asyncio.sleep(seconds)
+    return "ok"
+
+def test_full_queue_rejects_with_429():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=1, queue_timeout=1.0)
+        running = [asyncio.create_task(hold(controller, 0.1)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, 0.1)
+        assert await asyncio.gather(*running) == ["ok", "ok"]
+        return rejected.value, controller
+
+    error, controller = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.retry_after >= 1
+    assert controller.snapshot()["rejections"]["queue_full"] == 1
+    assert controller.active == 0 and controller.queue_depth == 0
+
+def test_missed_deadline_rejects_with_503():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=4, queue_timeout=0.05)
+        running = asyncio.create_task(hold(controller, 0.2))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, 0.1)
+        await running
+        return rejected.value, controller
+
+    error, controller = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert controller.active == 0 and controller.queue_depth == 0
+
+def test_cheap_request_displaces_model_bound_waiter():
+    async def scenario():
+        controller = AdmissionController("test", max_concurrency=1, max_queue=1, queue_timeout=1.0)
+        running = asyncio.create_task(hold(controller, 0.1))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(hold(controller, 0.01, MODEL_BOUND))
+        await asyncio.sleep(0)
+        cheap = asyncio.create_task(hold(controller, 0.01, CHEAP))
+        return await asyncio.gather(running, waiting, cheap, return_exceptions=True)
+
+    running, waiting, cheap = asyncio.run(scenario())
+    assert running == "ok" and cheap == "ok"
+    assert isinstance(waiting, AdmissionRejected) and waiting.reason == "shed"
+
+def test_saturated_search_endpoint_returns_retry_after(monkeypatch):
+    controller = AdmissionController("taxonomy_search", max_concurrency=1, max_queue=1, queue_timeout=1.0)
+    monkeypatch.setattr(taxonomy_endpoints, "search_admission", controller)
+    app = FastAPI()
+    app.include_router(taxonomy_endpoints.router, prefix="/taxonomy")
+    app.dependency_overrides[get_taxonomy_service] = lambda: SlowTaxonomy()
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[
+                client.get("/taxonomy/search", params={"query": f"query {i}"}) for i in range(5)
+            ])
+
+    responses = asyncio.run(burst())
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 429, 429, 429]
+    for response in responses:
+        if response.status_code == 429:
+            assert int(response.headers["Retry-After"]) >= 1